@@ -31,11 +31,13 @@ if __name__ == "__main__":
         print("Starting forecasting pipeline...")
         
         # Import the modules
-        from src.data.ingest import load_sales, validate_sales
+        from src.data.ingest import load_sales, validate_sales, decode_ids
         from src.features.build_features import prepare_features
+        from src.features.future import build_future_exog
         from src.models.ets import ETSForecaster
         from src.models.sarimax import SarimaxForecaster
-        from src.models.lgbm import LightGBMForecaster
+        from src.models.lgbm import LightGBMForecaster, predict_recursive_grouped
+        from src.features.spec import feature_columns
         from src.utils.config import settings
         import pandas as pd
         import numpy as np
@@ -55,6 +57,30 @@ if __name__ == "__main__":
         df_features = prepare_features(df)
         print(f"Features prepared: {df_features.shape}")
         
+        if settings.model_scope == 'cluster':
+            # One shared model per cluster of similar series instead of one per SKU
+            from src.data.panel import build_panel
+            from src.features.clusters import cluster_series
+            from src.models.cluster import forecast_ets_clusters, forecast_lgbm_clusters
+            panel = build_panel(df)
+            clusters = cluster_series(panel)
+            model_name = 'LightGBM' if settings.use_lgbm else 'ETS'
+            print(f"Fitting {model_name} on {clusters['cluster'].nunique()} clusters of {len(clusters)} series")
+            if model_name == 'LightGBM':
+                forecasts_df = forecast_lgbm_clusters(df_features, clusters, 12)
+            else:
+                forecasts_df = forecast_ets_clusters(panel, clusters, 12)
+            forecasts_df['forecast'] = np.maximum(forecasts_df['forecast'], 0)
+            forecasts_df['model'] = model_name
+            # Every series of every SKU; the per-SKU path's columns plus region_id
+            forecasts_df = forecasts_df.sort_values(['sku_id', 'region_id', 'date'])[['sku_id', 'region_id', 'date', 'forecast', 'model']]
+            output_dir = Path("data/outputs")
+            output_dir.mkdir(parents=True, exist_ok=True)
+            forecast_file = output_dir / "forecast.csv"
+            decode_ids(forecasts_df).to_csv(forecast_file, index=False)
+            print(f"Saved forecasts to {forecast_file}")
+            sys.exit(0)
+        
         # Load best models per SKU
         output_dir = Path("data/outputs")
         best_models_file = output_dir / "best_models_per_sku.csv"
@@ -70,17 +96,41 @@ if __name__ == "__main__":
         skus = df_features['sku_id'].unique()
         print(f"Found {len(skus)} unique SKUs")
         
-        # Get numeric feature columns for LightGBM
-        numeric_cols = df_features.select_dtypes(include=['number']).columns
-        feature_cols = [c for c in numeric_cols if c not in ['units', 'sku_id', 'region_id']]
+        # LightGBM reads the features its spec declares (zero_flag is the row's own units, not an input)
+        feature_cols = feature_columns('LightGBM', df_features)
         
         # Initialize models
         models = {
             'ETS': ETSForecaster(),
-            'SARIMAX': SarimaxForecaster(),
-            'LightGBM': LightGBMForecaster(feature_cols=feature_cols)
+            'SARIMAX': SarimaxForecaster()
         }
         
+        # Future exogenous rows (calendar, promo plan, carried values) for every series, 12 weeks ahead
+        future = build_future_exog(df_features, 12)
+        
+        # Each LightGBM SKU keeps its own model; the recursive forecast of all of them runs in one batched pass
+        counts = df_features['sku_id'].value_counts()
+        lgbm_skus = [sku for sku in skus if counts[sku] >= 30
+                     and (best_models_df.loc[best_models_df['sku_id'] == sku, 'model'].head(1) == 'LightGBM').any()]
+        if lgbm_skus:
+            # Calendar columns are shared across regions; each SKU's first series block, like sku_future below
+            first_region = future.groupby('sku_id', sort=False, observed=True)['region_id'].transform('first')
+            lgbm_future = future[future['sku_id'].isin(lgbm_skus) & (future['region_id'] == first_region)]
+            lgbm_models, direct = {}, []
+            for sku in lgbm_skus:
+                sku_data = df_features[df_features['sku_id'] == sku].sort_values('date')
+                model = LightGBMForecaster(feature_cols=feature_cols)
+                if settings.lgbm_strategy == 'direct':
+                    model.fit_direct(sku_data, 12)
+                    direct.append(model.predict_direct(sku_data, lgbm_future[lgbm_future['sku_id'] == sku]))
+                else:
+                    lgbm_models[sku] = model.fit(sku_data['units'], sku_data)
+            if direct:
+                lgbm_forecasts = pd.concat(direct, ignore_index=True)
+            else:
+                # lag/rolling inputs are filled from each model's own predictions step by step
+                lgbm_forecasts = predict_recursive_grouped(lgbm_models, df_features, lgbm_future)
+        
         # Generate forecasts
         forecasts = []
         for i, sku in enumerate(skus):
@@ -102,7 +152,7 @@ if __name__ == "__main__":
                 best_model_name = sku_best_models.iloc[0]['model']
             
             # Train the best model
-            model = models[best_model_name]
+            model = models.get(best_model_name)
             
             # Prepare data
             y = sku_data['units']
@@ -114,15 +164,19 @@ if __name__ == "__main__":
                 numeric_cols = X.select_dtypes(include=['number']).columns
                 X = X[numeric_cols] if len(numeric_cols) > 0 else None
             
+            # Calendar columns are shared across regions; use the SKU's first series block
+            sku_future = future[future['sku_id'] == sku].head(12)
+            Xf = sku_future[X.columns].reset_index(drop=True) if X is not None else None
+            
             if best_model_name == 'ETS':
                 model.fit(y)
                 forecast = model.predict(12)
             elif best_model_name == 'SARIMAX':
                 model.fit(y, X)
-                forecast = model.predict(12, X)
+                forecast = model.predict(12, Xf)
             elif best_model_name == 'LightGBM':
-                model.fit(y, X)
-                forecast = model.predict(12, X)
+                # first series block of the SKU, like sku_future
+                forecast = lgbm_forecasts.loc[lgbm_forecasts['sku_id'] == sku, 'forecast'].head(12)
             else:
                 continue
             
@@ -152,7 +206,7 @@ if __name__ == "__main__":
         
         # Save forecasts
         if forecasts:
-            forecasts_df = pd.concat(forecasts, ignore_index=True)
+            forecasts_df = decode_ids(pd.concat(forecasts, ignore_index=True))
             
             # Create outputs directory
             output_dir = Path("data/outputs")
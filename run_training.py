@@ -38,7 +38,8 @@ if __name__ == "__main__":
         from src.models.lgbm import LightGBMForecaster
         from src.utils.config import settings
         from src.evaluate.backtest import rolling_backtest
-        from src.evaluate.select import select_best_model
+        from src.evaluate.select import select_best_model, route_models
+        from src.data.quality import QUALITY_COLUMNS, load_quality_report
         import pandas as pd
         from pathlib import Path
         
@@ -50,6 +51,10 @@ if __name__ == "__main__":
         df = validate_sales(df)
         print(f"Loaded {len(df)} records")
         
+        # Per-series data-quality report cached by validate_sales drives model routing
+        report = load_quality_report() if settings.quality_report else pd.DataFrame(columns=QUALITY_COLUMNS)
+        routes = route_models(report)
+        
         # Prepare features
         print("Preparing features...")
         df_features = prepare_features(df)
@@ -82,13 +87,27 @@ if __name__ == "__main__":
                 print(f"Skipping {sku}: insufficient data ({len(sku_data)} records)")
                 continue
             
+            # Only models every region of this SKU is routed to
+            sku_routes = routes[routes['sku_id'] == str(sku)]
+            candidates = {name: m for name, m in models.items() if sku_routes.empty or sku_routes[name].all()}
+            if not candidates:
+                print(f"{sku}: no model suits its data quality, trying all models")
+                candidates = models
+            
             # Run backtesting
             sku_results = rolling_backtest(
                 data=sku_data,
-                models=models,
+                models=candidates,
                 n_splits=3,
                 test_size=0.2
             )
+            if sku_results.empty and len(candidates) < len(models):
+                print(f"{sku}: every routed model failed, trying all models")
+                sku_results = rolling_backtest(data=sku_data, models=models, n_splits=3, test_size=0.2)
+            if sku_results.empty:
+                # keep a best-model row for every SKU; ETS needs no exogenous features
+                sku_results = pd.DataFrame([{'model': 'ETS', 'wmape': float('nan'), 'smape': float('nan'),
+                                             'bias': float('nan'), 'mase': float('nan')}])
             
             # Select best model
             best_model_name = select_best_model(sku_results)
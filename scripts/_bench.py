@@ -0,0 +1,10 @@
+from __future__ import annotations
+import time
+from typing import Any, Callable, Tuple
+
+
+def timed(fn: Callable, *args, **kwargs) -> Tuple[Any, float]:
+    """Result of ``fn(*args, **kwargs)`` and its wall-clock seconds."""
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
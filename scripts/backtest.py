@@ -1,14 +1,18 @@
 from __future__ import annotations
+import joblib
 import pandas as pd
 from pathlib import Path
 from src.data.ingest import load_sales, validate_sales
+from src.data.panel import build_panel, load_panel, save_panel
+from src.data.quality import QUALITY_COLUMNS, load_quality_report
 from src.features.build_features import prepare_features
+from src.features.spec import feature_columns
 from src.models.ets import ETSForecaster
 from src.models.sarimax import SarimaxForecaster
 from src.models.lgbm import LightGBMForecaster
 from src.utils.config import settings
-from src.evaluate.backtest import rolling_backtest
-from src.evaluate.select import select_best_model_per_sku, create_model_leaderboard, save_best_models
+from src.evaluate.backtest import rolling_backtest_original, rolling_backtest_panel
+from src.evaluate.select import select_best_model_per_sku, create_model_leaderboard, save_best_models, route_models, routed_frame
 from src.models.explain import save_model_explanations, create_explanation_summary
 
 OUT_DIR = Path("data/outputs")
@@ -16,9 +20,6 @@ OUT_DIR = Path("data/outputs")
 
 def backtest_model(frame: pd.DataFrame, model_name: str):
     group_cols = ["sku_id","region_id"]
-    # numeric exogenous only
-    num_cols = frame.select_dtypes(include=["number"]).columns.tolist()
-    exog_cols = [c for c in num_cols if c not in ["units"]]
     horizon = settings.quick_horizon if getattr(settings, "quick_mode", False) else settings.horizon
     folds = 2 if getattr(settings, "quick_mode", False) else 4
 
@@ -27,41 +28,50 @@ def backtest_model(frame: pd.DataFrame, model_name: str):
             return ETSForecaster(seasonal="add", seasonal_periods=52).fit(y)
         def pred_fn(model, h, Xf):
             return model.predict(h)
-        return rolling_backtest(frame, group_cols, "date", "units", horizon, fit_fn, pred_fn, None, folds=folds)
+        # target-only: fold over row views of the memory-mapped panel (settings.panel_path) instead of groupby slices
+        save_panel(build_panel(frame, fields=["units"]))
+        return rolling_backtest_panel(load_panel(), horizon, fit_fn, pred_fn, folds=folds)
 
     if model_name == "SARIMAX":
+        exog_cols = feature_columns("SARIMAX", frame)
+        # positional index: a series' rows keep their interleaved frame index, which statsmodels cannot extend
         def fit_fn(y, X):
-            return SarimaxForecaster().fit(y, X)
+            return SarimaxForecaster().fit(y.reset_index(drop=True), X.reset_index(drop=True))
         def pred_fn(model, h, Xf):
-            return model.predict(h, Xf)
-        return rolling_backtest(frame, group_cols, "date", "units", horizon, fit_fn, pred_fn, exog_cols, folds=folds)
+            return model.predict(h, Xf.to_numpy())
+        return rolling_backtest_original(frame, group_cols, "date", "units", horizon, fit_fn, pred_fn, exog_cols, folds=folds)
 
     if model_name == "LightGBM" and settings.use_lgbm:
-        feat_cols = [c for c in exog_cols if c.startswith(("lag_","rollmean_","rollstd_","promo_flag","discount","is_holiday","month","weekofyear","quarter"))]
+        feat_cols = feature_columns("LightGBM", frame)
         def fit_fn(y, X):
             return LightGBMForecaster(feature_cols=feat_cols).fit(y, X)
         def pred_fn(model, h, Xf):
             return model.predict(h, Xf)
-        return rolling_backtest(frame, group_cols, "date", "units", horizon, fit_fn, pred_fn, feat_cols, folds=folds)
+        return rolling_backtest_original(frame, group_cols, "date", "units", horizon, fit_fn, pred_fn, feat_cols, folds=folds)
 
     return pd.DataFrame()
 
 
 def main():
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    sales = validate_sales(load_sales(sample=False))
-    feats = prepare_features(sales)
-    # limit number of series in quick mode
-    if getattr(settings, "quick_mode", False):
-        groups = feats[["sku_id","region_id"]].drop_duplicates().head(getattr(settings, "max_groups", 10))
-        feats = feats.merge(groups, on=["sku_id","region_id"], how="inner")
-
-    metrics_all = []
+    # limit number of series in quick mode; the filter is pushed down into load_sales
+    series = getattr(settings, "max_groups", 10) if getattr(settings, "quick_mode", False) else None
+    sales = validate_sales(load_sales(sample=False, series=series))
     model_list = ["ETS", "SARIMAX", "LightGBM"]
     if getattr(settings, "quick_mode", False):
         model_list = ["ETS"]
+    # only the features the scheduled models declare (ETS alone skips lag/rolling work)
+    feats = prepare_features(sales, models=model_list)
+    # validate_sales cached the data-quality report; it decides which models each series gets
+    report = load_quality_report() if settings.quality_report else pd.DataFrame(columns=QUALITY_COLUMNS)
+    routes = route_models(report)
+
+    metrics_all = []
     for name in model_list:
-        dfm = backtest_model(feats, name)
+        frame = routed_frame(feats, routes, name)
+        if frame.empty:
+            continue
+        dfm = backtest_model(frame, name)
         if not dfm.empty:
             dfm["model"] = name
             metrics_all.append(dfm)
@@ -83,7 +93,7 @@ def main():
         
         # Save trained best models
         models_dir = OUT_DIR / "trained_models"
-        save_best_models(sales, best_models_df, models_dir)
+        save_best_models(feats, best_models_df, models_dir)
         
         # Generate model explanations for LightGBM models
         explanations_dir = OUT_DIR / "explanations"
@@ -96,7 +106,7 @@ def main():
                     model_path = models_dir / f"best_model_{sku_id.replace('/', '_')}.joblib"
                     if model_path.exists():
                         model = joblib.load(model_path)
-                        feat_cols = [c for c in sku_data.columns if c.startswith(("lag_", "rollmean_", "rollstd_", "promo_flag", "discount", "is_holiday", "month", "weekofyear", "quarter"))]
+                        feat_cols = feature_columns("LightGBM", sku_data)
                         if feat_cols:
                             X = sku_data[feat_cols].fillna(0)
                             save_model_explanations(model, feat_cols, X, explanations_dir, sku_id)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+import shutil
+import tempfile
+from pathlib import Path
+import pandas as pd
+from scripts._bench import timed
+from src.data.ingest import load_sales
+from src.features.build_features import add_lag_roll
+from src.utils.config import settings
+
+SOURCE = Path("data/raw/salesdaily.xls")
+SCALE = 1_000  # copies of the daily file, one region each
+
+
+def write_scaled(source: Path, scale: int, out_dir: Path) -> Path:
+    """Stack `scale` copies of the wide daily file, each tagged with its own region."""
+    base = pd.read_csv(source)
+    fp = out_dir / "salesdaily_scaled.csv"
+    with open(fp, "w", newline="") as f:
+        for i in range(scale):
+            base.assign(region=f"R{i:04d}").to_csv(f, index=False, header=(i == 0))
+    return fp
+
+
+def _run(backend: str) -> dict:
+    settings.backend = backend
+    weekly, t_ingest = timed(load_sales, sample=False)
+    feats, t_feats = timed(add_lag_roll, weekly)
+    return {"backend": backend, "ingest_s": t_ingest, "lag_roll_s": t_feats, "weekly": weekly, "features": feats}
+
+
+def main():
+    tmp = Path(tempfile.mkdtemp(prefix="bench_backends_"))
+    saved = {k: getattr(settings, k) for k in ["backend","csv_path","ingest_cache","dedup_granularity","ingest_chunksize","quality_report"]}
+    try:
+        fp = write_scaled(SOURCE, SCALE, tmp)
+        print(f"{SOURCE.name} x {SCALE}: {fp.stat().st_size / 2**20:,.0f} MB")
+        settings.csv_path = str(fp)
+        settings.ingest_cache = False
+        settings.ingest_chunksize = None
+        settings.dedup_granularity = False
+        runs = [_run("pandas"), _run("polars")]
+    finally:
+        for k, v in saved.items():
+            setattr(settings, k, v)
+        shutil.rmtree(tmp, ignore_errors=True)
+    pd.testing.assert_frame_equal(runs[0]["weekly"], runs[1]["weekly"])
+    # cumulative-sum and online rolling variances differ by rounding only
+    pd.testing.assert_frame_equal(runs[0]["features"], runs[1]["features"], check_exact=False, rtol=1e-6, atol=1e-6)
+    report = pd.DataFrame([{k: v for k, v in r.items() if k.endswith("_s")} | {"backend": r["backend"]} for r in runs]).set_index("backend")
+    report["total_s"] = report.sum(axis=1)
+    print(f"{len(runs[0]['weekly']):,} series-weeks, outputs match")
+    print(report.round(2).to_string())
+    print(f"speedup: {report.loc['pandas','total_s'] / report.loc['polars','total_s']:.1f}x")
+
+if __name__ == "__main__":
+    main()
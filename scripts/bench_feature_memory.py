@@ -0,0 +1,47 @@
+from __future__ import annotations
+import tracemalloc
+import pandas as pd
+from scripts._bench import timed
+from src.data.synthetic import generate_synthetic
+from src.features.build_features import prepare_features
+from src.utils.config import settings
+
+N_SERIES = 1_000
+N_WEEKS = 156
+
+
+def make_weekly_panel(n_series: int, n_weeks: int, seed: int = 0) -> pd.DataFrame:
+    return generate_synthetic(n_skus=n_series // 4, n_regions=4, n_weeks=n_weeks, seed=seed)
+
+
+def _profile(panel: pd.DataFrame, precision: str) -> dict:
+    settings.precision = precision
+    tracemalloc.start()
+    feats, elapsed = timed(prepare_features, panel)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    num = feats.select_dtypes(include=["number"]).drop(columns=["units"])
+    return {
+        "precision": precision,
+        "rows": len(feats),
+        "frame_mb": feats.memory_usage(deep=True).sum() / 2**20,
+        "feature_matrix_mb": num.memory_usage(deep=True).sum() / 2**20,
+        "peak_mb": peak / 2**20,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    panel = make_weekly_panel(N_SERIES, N_WEEKS)
+    print(f"Panel: {N_SERIES} series x {N_WEEKS} weeks, light_features={settings.light_features}")
+    original = settings.precision
+    try:
+        report = pd.DataFrame([_profile(panel, "double"), _profile(panel, "lean")]).set_index("precision")
+    finally:
+        settings.precision = original
+    print(report.round(2).to_string())
+    ratio = report.loc["lean", "feature_matrix_mb"] / report.loc["double", "feature_matrix_mb"]
+    print(f"lean feature matrix is {ratio:.0%} of double")
+
+if __name__ == "__main__":
+    main()
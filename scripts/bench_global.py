@@ -0,0 +1,72 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from scripts._bench import timed
+from src.data.ingest import load_sales
+from src.data.synthetic import generate_synthetic
+from src.evaluate.metrics import wmape
+from src.features.build_features import compute_features
+from src.features.spec import feature_columns
+from src.models.lgbm import GlobalLightGBMForecaster, LightGBMForecaster
+
+N_SKUS = 2_500
+N_REGIONS = 4
+N_WEEKS = 104
+HORIZON = 12
+REF_SERIES = 500  # synthetic series fit one by one; their time is scaled to the panel
+
+
+def split_holdout(feats: pd.DataFrame, horizon: int):
+    """Last `horizon` weeks of every series as the test block."""
+    feats = feats.sort_values(["sku_id","region_id","date"])
+    back = feats.groupby(["sku_id","region_id"], sort=False, observed=True).cumcount(ascending=False).to_numpy()
+    return feats[back >= horizon], feats[back < horizon]
+
+
+def per_series(train: pd.DataFrame, test: pd.DataFrame, cols) -> np.ndarray:
+    """One LightGBMForecaster per series, as in the run_training.py loop."""
+    preds = []
+    tests = dict(iter(test.groupby(["sku_id","region_id"], sort=False, observed=True)))
+    for key, g in train.groupby(["sku_id","region_id"], sort=False, observed=True):
+        model = LightGBMForecaster(feature_cols=cols)
+        model.model.set_params(verbose=-1)
+        model.fit(g["units"], g)
+        preds.append(model.predict_recursive(g, tests[key])["forecast"].to_numpy())
+    return np.concatenate(preds)
+
+
+def global_model(train: pd.DataFrame, test: pd.DataFrame, cols) -> np.ndarray:
+    model = GlobalLightGBMForecaster(feature_cols=cols)
+    model.model.set_params(verbose=-1)
+    model.fit(train["units"], train)
+    return model.predict_recursive(train, test)["forecast"].to_numpy()
+
+
+def _compare(name: str, feats: pd.DataFrame, ref_series: int) -> dict:
+    train, test = split_holdout(feats, HORIZON)
+    cols = feature_columns("LightGBM", feats)
+    n_series = test.groupby(["sku_id","region_id"], observed=True).ngroups
+    ref_series = min(ref_series, n_series)
+    # per-series fits on the first `ref_series` series (whole blocks in series/date order)
+    keys = test[["sku_id","region_id"]].drop_duplicates().iloc[:ref_series]
+    in_ref = lambda f: f.merge(keys, on=["sku_id","region_id"])
+    y_ref = in_ref(test)["units"].to_numpy()
+    loc, t_loc = timed(per_series, in_ref(train), in_ref(test), cols)
+    glo, t_glo = timed(global_model, train, test, cols)
+    t_loc *= n_series / ref_series
+    return {
+        "panel": name, "series": n_series, "per_series_s": t_loc, "global_s": t_glo,
+        "per_series_wmape": wmape(y_ref, loc), "global_wmape": wmape(y_ref, glo[:len(y_ref)]),
+    }
+
+
+def main():
+    bundled = compute_features(load_sales(sample=False), models=["LightGBM"])
+    synthetic = compute_features(generate_synthetic(n_skus=N_SKUS, n_regions=N_REGIONS, n_weeks=N_WEEKS), models=["LightGBM"])
+    report = pd.DataFrame([_compare("bundled", bundled, REF_SERIES), _compare("synthetic", synthetic, REF_SERIES)]).set_index("panel")
+    report["speedup"] = report["per_series_s"] / report["global_s"]
+    print(f"{HORIZON}-week holdout per series; per-series time scaled from {REF_SERIES} series where the panel is larger")
+    print(report.round(3).to_string())
+
+if __name__ == "__main__":
+    main()
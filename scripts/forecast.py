@@ -1,8 +1,10 @@
 from __future__ import annotations
 import pandas as pd
 from pathlib import Path
-from src.data.ingest import load_sales, validate_sales
+from src.data.ingest import load_sales, validate_sales, decode_ids
 from src.features.build_features import prepare_features
+from src.features.future import build_future_exog
+from src.features.spec import feature_columns
 from src.models.ets import ETSForecaster
 from src.models.sarimax import SarimaxForecaster
 from src.utils.config import settings
@@ -14,31 +16,21 @@ def main():
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
     sales = validate_sales(load_sales(sample=False))
-    feats = prepare_features(sales)
+    feats = prepare_features(sales, models=["SARIMAX","ETS"])
 
     forecasts = []
     horizon = settings.horizon
+    exog_cols = feature_columns("SARIMAX", feats)
+    # future exogenous rows for every series at once, `horizon` rows per series
+    future = build_future_exog(feats, horizon, exog_cols)
+    future_blocks = dict(iter(future.groupby(["sku_id","region_id"], sort=False, observed=True)))
 
-    for (sku, region), g in feats.groupby(["sku_id","region_id"], sort=False):
+    for (sku, region), g in feats.groupby(["sku_id","region_id"], sort=False, observed=True):
         g = g.sort_values("date")
         y = g["units"]
-        exog_cols = [c for c in g.columns if c not in ["date","units","sku_id","region_id"]]
         X = g[exog_cols]
-
-        # naive future exog: repeat last known calendar fields
-        last = g.iloc[-1:].copy()
-        future = []
-        for i in range(1, horizon + 1):
-            row = last.copy()
-            row["date"] = row["date"] + pd.to_timedelta(i, unit="W")
-            row["weekofyear"] = int(((last["weekofyear"].values[0] + i - 1) % 52) + 1)
-            row["month"] = int(((last["month"].values[0] + (i // 4)) - 1) % 12 + 1)
-            row["quarter"] = (row["month"] - 1) // 3 + 1
-            row["promo_flag"] = 0
-            row["discount"] = 0.0
-            future.append(row)
-        Xf = pd.concat(future, ignore_index=True)
-        Xf = Xf.reindex(columns=exog_cols, fill_value=0)
+        block = future_blocks[(sku, region)]
+        Xf = block[exog_cols].reset_index(drop=True)
 
         try:
             model = SarimaxForecaster().fit(y, X)
@@ -48,7 +40,7 @@ def main():
             mean, lower, upper = model.predict_with_intervals(horizon, alpha=0.05)
 
         df_pred = pd.DataFrame({
-            "date": pd.date_range(g["date"].iloc[-1] + pd.Timedelta(weeks=1), periods=horizon, freq="W-SUN"),
+            "date": block["date"].to_numpy(),
             "sku_id": sku,
             "region_id": region,
             "forecast": mean.values,
@@ -57,7 +49,7 @@ def main():
         })
         forecasts.append(df_pred)
 
-    out = pd.concat(forecasts, ignore_index=True)
+    out = decode_ids(pd.concat(forecasts, ignore_index=True))
     out.to_csv(OUT_DIR / "forecast.csv", index=False)
     print("Saved:", OUT_DIR / "forecast.csv")
 
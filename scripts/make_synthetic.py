@@ -0,0 +1,22 @@
+from __future__ import annotations
+import time
+from src.data.synthetic import write_synthetic_shards
+
+OUT_DIR = "data/synthetic"
+FORMAT = "csv"  # "csv" shards load via settings.csv_path; "parquet" for columnar tooling
+N_SKUS = 250_000
+N_REGIONS = 4
+N_WEEKS = 156
+SEED = 42
+
+
+def main():
+    start = time.perf_counter()
+    paths = write_synthetic_shards(OUT_DIR, fmt=FORMAT, n_skus=N_SKUS, n_regions=N_REGIONS,
+                                   n_weeks=N_WEEKS, seed=SEED, intermittency=0.1)
+    rows = N_SKUS * N_REGIONS * N_WEEKS
+    print(f"Wrote {rows:,} series-weeks ({N_SKUS * N_REGIONS:,} series) to {len(paths)} {FORMAT} shards "
+          f"in {OUT_DIR} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -933,6 +933,15 @@ def load_raw_data_cached():
     except:
         return None
 
+def read_raw_table(source):
+    """Read an uploaded or on-disk table by sniffing its content (see src/data/formats.py)"""
+    import sys
+    import os
+    if os.getcwd() not in sys.path:
+        sys.path.append(os.getcwd())
+    from src.data.formats import read_table
+    return read_table(source)
+
 st.set_page_config(
     page_title="Pharma Sales Forecasting & Inventory Planning", 
     layout="wide",
@@ -1228,18 +1237,8 @@ if uploaded_files is not None and len(uploaded_files) > 0:
             
             # Try to read the file
             try:
-                if uploaded_file.name.endswith('.xlsx'):
-                    df_uploaded = pd.read_excel(uploaded_file, engine='openpyxl')
-                elif uploaded_file.name.endswith('.xls'):
-                    # Try as Excel first, then fallback to CSV if it fails
-                    try:
-                        df_uploaded = pd.read_excel(uploaded_file, engine='xlrd')
-                    except Exception:
-                        # Reset file pointer and try as CSV
-                        uploaded_file.seek(0)
-                        df_uploaded = pd.read_csv(uploaded_file)
-                else:
-                    df_uploaded = pd.read_csv(uploaded_file)
+                # Dispatch on file content; .xls uploads are often CSV
+                df_uploaded = read_raw_table(uploaded_file)
                         
                 st.success("✅ File read successfully!")
                 
@@ -1451,6 +1450,7 @@ fcst_fp = data_dir / "forecast.csv"
 metrics_fp = data_dir / "metrics.csv"
 best_models_fp = data_dir / "best_models_per_sku.csv"
 leaderboard_fp = data_dir / "model_leaderboard.csv"
+quality_fp = data_dir / "data_quality.csv"
 
 @st.cache_data
 def load_data():
@@ -1461,6 +1461,16 @@ def load_data():
     df_leaderboard = pd.read_csv(leaderboard_fp) if leaderboard_fp.exists() else pd.DataFrame()
     return df_fcst, df_m, df_best, df_leaderboard
 
+@st.cache_data
+def load_quality():
+    """Per-series data-quality report cached by validate_sales during training"""
+    import sys
+    import os
+    if os.getcwd() not in sys.path:
+        sys.path.append(os.getcwd())
+    from src.data.quality import load_quality_report
+    return load_quality_report(quality_fp)
+
 @st.cache_data
 def load_sample_data():
     """Load the raw sample data that was used as input."""
@@ -1491,30 +1501,8 @@ def load_sample_data():
         combined_data = []
         for file_path in all_files:
             try:
-                # Try CSV first (since .xls files are actually CSV)
-                try:
-                    df = pd.read_csv(file_path)
-                except:
-                    # If CSV fails, try as Excel
-                    df = None
-                    
-                    # Method 1: Try as Excel with different engines
-                    for engine in ['openpyxl', 'xlrd']:
-                        try:
-                            df = pd.read_excel(file_path, engine=engine)
-                            break
-                        except:
-                            continue
-                    
-                    # Method 2: Try Excel without engine specification
-                    if df is None:
-                        try:
-                            df = pd.read_excel(file_path)
-                        except:
-                            pass
-                    
-                    if df is None:
-                        raise Exception("Could not read file with any method")
+                # Format is sniffed once per file signature (.xls files here are actually CSV)
+                df = read_raw_table(file_path)
                 
                 # Add source file info
                 df['source_file'] = os.path.basename(file_path)
@@ -1674,6 +1662,22 @@ if not st.session_state.analysis_completed:
     """, unsafe_allow_html=True)
     st.stop()
 
+# Data quality report (computed once in validate_sales, not re-derived here)
+df_quality = load_quality()
+if not df_quality.empty and st.session_state.current_section in ["overview", "performance"]:
+    with st.expander("🩺 Data Quality Report", expanded=False):
+        flagged = df_quality[df_quality["issues"] != ""]
+        q1, q2, q3, q4 = st.columns(4)
+        with q1:
+            st.metric("Series", len(df_quality))
+        with q2:
+            st.metric("Series with issues", len(flagged))
+        with q3:
+            st.metric("Missing periods", int(df_quality["missing_periods"].sum()))
+        with q4:
+            st.metric("Outlier points", int(df_quality["outliers"].sum()))
+        st.dataframe(flagged if not flagged.empty else df_quality, width='stretch')
+
 # Show data sections only when analysis is completed and we have data
 if st.session_state.analysis_completed and not df_fcst.empty and st.session_state.current_section in ["forecasts", "inventory", "performance", "overview"]:
     # Calculate inventory metrics
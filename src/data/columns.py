@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+# Column roles of the weekly aggregation, shared by every ingest backend
+WEEK_KEYS = ["sku_id","region_id","date"]
+MEAN_COLS = ["price","discount"]  # weekly mean
+MAX_COLS = ["promo_flag","stockout_flag"]  # weekly max
+LAST_COLS = ["channel_id"]  # last observed value in the week
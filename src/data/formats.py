@@ -0,0 +1,54 @@
+from __future__ import annotations
+import pandas as pd
+from pathlib import Path
+from typing import Dict, IO, Tuple, Union
+
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# (resolved path, size, mtime_ns) -> detected format
+_FORMAT_CACHE: Dict[Tuple[str, int, int], str] = {}
+
+
+def _detect(head: bytes) -> str:
+    if head.startswith(OLE2_MAGIC):
+        return "xls"
+    if head.startswith(ZIP_MAGIC):
+        return "xlsx"
+    return "csv"
+
+
+def sniff_format(source: Union[Path, str, IO[bytes]]) -> str:
+    """Return "xls" (OLE2), "xlsx" (ZIP) or "csv" (anything else) from the leading bytes.
+
+    Results for paths are remembered per file signature (path, size, mtime), so
+    repeated loads of an unchanged file skip the read entirely. File-like
+    objects are sniffed every time and rewound afterwards.
+    """
+    if hasattr(source, "read"):
+        pos = source.tell()
+        head = source.read(len(OLE2_MAGIC))
+        source.seek(pos)
+        return _detect(head)
+    fp = Path(source)
+    st = fp.stat()
+    sig = (str(fp.resolve()), st.st_size, st.st_mtime_ns)
+    fmt = _FORMAT_CACHE.get(sig)
+    if fmt is None:
+        with open(fp, "rb") as f:
+            fmt = _detect(f.read(len(OLE2_MAGIC)))
+        _FORMAT_CACHE[sig] = fmt
+    return fmt
+
+
+def read_table(source: Union[Path, str, IO[bytes]], **csv_kwargs) -> pd.DataFrame:
+    """Read a sales table with the reader matching its actual content, not its extension."""
+    fmt = sniff_format(source)
+    if fmt == "csv":
+        return pd.read_csv(source, **csv_kwargs)
+    try:
+        if fmt == "xlsx":
+            return pd.read_excel(source, engine="openpyxl")
+        return pd.read_excel(source, engine="xlrd")
+    except ImportError:
+        raise ImportError("Reading Excel requires 'openpyxl' for .xlsx or 'xlrd==1.2.0' for .xls.")
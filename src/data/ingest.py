@@ -1,12 +1,33 @@
 from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Optional
 from pathlib import Path
 
 DATA_DIR = Path("data")
 OUTPUTS_DIR = DATA_DIR / "outputs"
 RAW_DIR = DATA_DIR / "raw"
+CACHE_DIR = DATA_DIR / "cache"
+INGEST_CACHE_DIR = CACHE_DIR / "ingest"
+DIGEST_INDEX = INGEST_CACHE_DIR / "digests.json"
+_DIGEST_LOCK = threading.Lock()  # serializes digest index updates across thread workers
+WEEKLY_STORE_DIR = CACHE_DIR / "weekly_store"
+WEEKLY_STORE_MAX_SEGMENTS = 16  # weekly store segments kept before they are compacted into one
+COVERAGE_DIR = CACHE_DIR / "coverage"
+COVERAGE_VERSION = 2  # bump when the coverage JSON layout changes
+SERIES_FILTER_CHUNKSIZE = 100_000
+STREAM_FOLD_CHUNKS = 8  # chunk partials collected before the streaming ingest folds them
+from src.data import polars_backend, sql_source
+from src.data.columns import LAST_COLS, MAX_COLS, MEAN_COLS, WEEK_KEYS
+from src.data.formats import read_table, sniff_format
+from src.data.quality import quality_report, save_quality_report
+from src.data.synthetic import generate_synthetic
 from src.utils.config import settings
 
 def ensure_dirs() -> None:
@@ -14,57 +35,38 @@ def ensure_dirs() -> None:
     RAW_DIR.mkdir(parents=True, exist_ok=True)
 
 def generate_sample_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
-    rng = pd.date_range("2022-01-02", periods=140, freq="W-SUN")
-    skus = ["SKU_A", "SKU_B", "SKU_C"]
-    regions = ["North", "South"]
-    rows = []
-    rng_np = np.arange(len(rng))
-    for sku in skus:
-        for region in regions:
-            base = 80 if sku == "SKU_A" else 50 if sku == "SKU_B" else 30
-            seasonal = 15 * np.sin(2 * np.pi * rng_np / 52) + 10
-            trend = 0.2 * rng_np
-            noise = np.random.normal(0, 6, size=len(rng))
-            units = np.clip(base + seasonal + trend + noise, 0, None)
-            promo_weeks = set(np.random.choice(rng, size=6, replace=False))
-            for dt, u in zip(rng, units):
-                discount = 0.0
-                lift = 1.0
-                if dt in promo_weeks:
-                    discount = float(np.random.choice([0.1, 0.15, 0.2]))
-                    lift = 1.0 + discount * 2.5
-                stockout_flag = 1 if np.random.rand() < 0.02 else 0
-                sold = 0 if stockout_flag else u * lift
-                rows.append({
-                    "date": dt,
-                    "sku_id": sku,
-                    "region_id": region,
-                    "channel_id": "Retail",
-                    "units": float(np.round(sold, 1)),
-                    "price": 10.0 if sku == "SKU_A" else 7.5 if sku == "SKU_B" else 6.0,
-                    "discount": discount,
-                    "promo_flag": 1 if discount > 0 else 0,
-                    "stockout_flag": stockout_flag
-                })
-    sales = pd.DataFrame(rows)
+    sales = generate_synthetic(n_skus=3, n_regions=2, n_weeks=140, promo_rate=6 / 140,
+                               sku_names=["SKU_A","SKU_B","SKU_C"], region_names=["North","South"])
+    sales = decode_ids(sales)
     promo = sales.loc[sales.promo_flag == 1, ["sku_id","region_id","date","discount"]].copy()
     return sales, promo
 
+def encode_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """Carry identifier columns as pandas categoricals (no-op when settings.categorical_ids is off)."""
+    if not getattr(settings, "categorical_ids", False):
+        return df
+    df = df.copy()
+    for c in ID_COLS:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    return df
+
+def decode_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """Turn categorical identifier columns back into plain strings for output files and the API."""
+    df = df.copy()
+    for c in ID_COLS:
+        if c in df.columns and isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype(str).where(df[c].notna())
+    return df
+
+def _polars_backend() -> bool:
+    return getattr(settings, "backend", "pandas") == "polars"
+
 def _read_table(fp: Path) -> pd.DataFrame:
-    if fp.suffix.lower() in [".xlsx", ".xls"]:
-        try:
-            if fp.suffix.lower() == ".xlsx":
-                return pd.read_excel(fp, engine="openpyxl")
-            return pd.read_excel(fp, engine="xlrd")
-        except ImportError:
-            raise ImportError("Reading Excel requires 'openpyxl' for .xlsx or 'xlrd==1.2.0' for .xls.")
-        except Exception:
-            # Some files with .xls extension are actually CSV; try CSV fallback
-            try:
-                return pd.read_csv(fp)
-            except Exception:
-                raise
-    return pd.read_csv(fp)
+    # Dispatch on content: the bundled .xls files are really CSV
+    if _polars_backend() and sniff_format(fp) == "csv":
+        return polars_backend.read_csv_arrow(fp)
+    return read_table(fp)
 
 def _normalize_schema(df_raw: pd.DataFrame, colmap: Dict[str, str]) -> pd.DataFrame:
     # Case-insensitive and whitespace-tolerant mapping from user columns to internal names
@@ -77,30 +79,93 @@ def _normalize_schema(df_raw: pd.DataFrame, colmap: Dict[str, str]) -> pd.DataFr
     df = df_raw.rename(columns=rename_map).copy()
     return df
 
+ID_COLS = ["sku_id","region_id","channel_id"]
+
+def _week_end(dates: pd.Series) -> pd.Series:
+    """Snap timestamps to the W-SUN bin label used by resample.
+
+    Weekly bins are right-closed on whole days, so any time on a Sunday still
+    belongs to that Sunday's week.
+    """
+    day = dates.dt.normalize()
+    return day + pd.to_timedelta((6 - day.dt.dayofweek) % 7, unit="D")
+
+def _partial_week_agg(df: pd.DataFrame) -> pd.DataFrame:
+    """Reduce normalized rows to mergeable (sku_id, region_id, week) partials.
+
+    Means are carried as `<col>__sum`/`<col>__cnt` and "last" columns as the
+    value plus the timestamp it was observed at (`<col>__ts`), so partials from
+    different chunks can be folded together with `_combine_week_partials`.
+    """
+    work = df.copy()
+    work["date"] = pd.to_datetime(work["date"], errors="coerce")
+    work = work.dropna(subset=["date"])
+    ts = work["date"]
+    work["date"] = _week_end(ts)
+    spec = {"units": ("units", "sum")}
+    for c in MEAN_COLS:
+        if c in work.columns:
+            spec[f"{c}__sum"] = (c, "sum")
+            spec[f"{c}__cnt"] = (c, "count")
+    for c in MAX_COLS:
+        if c in work.columns:
+            spec[c] = (c, "max")
+    part = work.groupby(WEEK_KEYS, sort=False).agg(**spec)
+    for c in LAST_COLS:
+        if c in work.columns:
+            obs = work.loc[work[c].notna(), WEEK_KEYS + [c]].assign(**{f"{c}__ts": ts})
+            obs = obs.sort_values(f"{c}__ts", kind="mergesort")
+            part = part.join(obs.groupby(WEEK_KEYS, sort=False)[[c, f"{c}__ts"]].last())
+    return part.reset_index()
+
+def _combine_week_partials(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """Fold several partial frames into one; later parts win ties for "last" columns."""
+    both = pd.concat(parts, ignore_index=True, sort=False)
+    spec = {}
+    for c in both.columns:
+        if c in WEEK_KEYS or c.endswith("__ts") or c in LAST_COLS:
+            continue
+        spec[c] = "max" if c in MAX_COLS else "sum"
+    out = both.groupby(WEEK_KEYS, sort=False).agg(spec)
+    for c in LAST_COLS:
+        if c in both.columns:
+            obs = both.loc[both[c].notna(), WEEK_KEYS + [c, f"{c}__ts"]]
+            obs = obs.sort_values(f"{c}__ts", kind="mergesort")
+            out = out.join(obs.groupby(WEEK_KEYS, sort=False)[[c, f"{c}__ts"]].last())
+    return out.reset_index()
+
+def _finalize_week_partials(part: pd.DataFrame) -> pd.DataFrame:
+    """Turn folded partials into the weekly frame, adding empty weeks between each series' first and last week."""
+    bounds = part.groupby(["sku_id","region_id"])["date"].agg(["min","max"])
+    n_weeks = ((bounds["max"] - bounds["min"]) // pd.Timedelta(weeks=1)).astype(np.int64) + 1
+    reps = n_weeks.to_numpy()
+    starts = np.repeat(bounds["min"].to_numpy(), reps)
+    offsets = np.arange(reps.sum()) - np.repeat(np.cumsum(reps) - reps, reps)
+    full = pd.DataFrame({
+        "sku_id": np.repeat(bounds.index.get_level_values("sku_id").to_numpy(), reps),
+        "region_id": np.repeat(bounds.index.get_level_values("region_id").to_numpy(), reps),
+        "date": starts + offsets * np.timedelta64(7, "D"),
+    })
+    out = full.merge(part, on=WEEK_KEYS, how="left")
+    out["units"] = out["units"].fillna(0.0)
+    cols = WEEK_KEYS + ["units"]
+    for c in MEAN_COLS:
+        if f"{c}__sum" in out.columns:
+            out[c] = out[f"{c}__sum"] / out[f"{c}__cnt"].where(out[f"{c}__cnt"] > 0)
+            cols.append(c)
+    cols += [c for c in MAX_COLS + LAST_COLS if c in out.columns]
+    return out[cols]
+
 def _aggregate_to_week(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"]) 
-    df = df.sort_values(["sku_id","region_id","date"]) 
-    df.set_index("date", inplace=True)
-    agg_dict = {"units": "sum"}
-    if "price" in df.columns:
-        agg_dict["price"] = "mean"
-    if "discount" in df.columns:
-        agg_dict["discount"] = "mean"
-    if "promo_flag" in df.columns:
-        agg_dict["promo_flag"] = "max"
-    if "stockout_flag" in df.columns:
-        agg_dict["stockout_flag"] = "max"
-    group_cols = ["sku_id","region_id"]
-    keep_cols: List[str] = [c for c in ["channel_id"] if c in df.columns]
-    resampled = (
-        df.groupby(group_cols)
-          .resample("W-SUN")
-          .agg({**agg_dict, **{c: "last" for c in keep_cols}})
-          .reset_index()
-    )
-    return resampled
+    """Aggregate normalized rows to W-SUN weeks per (sku_id, region_id).
+
+    Equivalent to ``groupby(["sku_id","region_id"]).resample("W-SUN")`` but
+    snaps dates to week ends arithmetically and aggregates with one hash
+    groupby instead of building a resampler per series.
+    """
+    if _polars_backend():
+        return polars_backend.aggregate_to_week(df)
+    return _finalize_week_partials(_partial_week_agg(df))
 
 def _auto_detect_columns(df_raw: pd.DataFrame) -> Dict[str, str]:
     cols_lower = {c.lower().strip(): c for c in df_raw.columns}
@@ -119,11 +184,640 @@ def _auto_detect_columns(df_raw: pd.DataFrame) -> Dict[str, str]:
                 break
     return detected
 
-def load_sales(sample: bool = True) -> pd.DataFrame:
+def _load_file(fp: Path, base_colmap: Dict[str, str]) -> pd.DataFrame:
+    """Read one raw file and normalize it to the long internal schema."""
+    return _normalize_raw(_read_table(fp), base_colmap, fp.name)
+
+def _normalize_raw(df_raw: pd.DataFrame, base_colmap: Dict[str, str], name: str) -> pd.DataFrame:
+    required_keys = ["date","sku_id","region_id","units"]
+    # Build per-file column map: auto-detected, overridden by settings.column_map when present
+    auto_map = _auto_detect_columns(df_raw)
+    effective_map: Dict[str, str] = {}
+    for k in required_keys:
+        # prefer settings mapping if the target exists in file; else use auto-detected
+        if k in base_colmap and base_colmap[k]:
+            val = base_colmap[k]
+            if val.lower().strip() in {c.lower().strip() for c in df_raw.columns}:
+                effective_map[k] = val
+                continue
+        if k in auto_map:
+            effective_map[k] = auto_map[k]
+    # Handle wide format: if units not identified but there are many product columns, melt
+    if "units" not in effective_map and "sku_id" not in effective_map:
+        lower_cols = {c.lower().strip(): c for c in df_raw.columns}
+        date_col = effective_map.get("date") or auto_map.get("date")
+        region_col = effective_map.get("region_id") or auto_map.get("region_id")
+        known_meta = {x for x in [date_col, region_col, "year", "month", "hour", "weekday", "weekday name", "type"] if x}
+        product_cols = [c for c in df_raw.columns if c not in known_meta]
+        if date_col and product_cols:
+            id_vars = [date_col]
+            if region_col and region_col in df_raw.columns:
+                id_vars.append(region_col)
+            melted = df_raw.melt(id_vars=id_vars, value_vars=product_cols, var_name="sku_id", value_name="units")
+            melted = melted.rename(columns={date_col: "date"})
+            if region_col and region_col in melted.columns:
+                melted = melted.rename(columns={region_col: "region_id"})
+            if "region_id" not in melted.columns:
+                melted["region_id"] = "All"
+            # If Type column exists, keep Actuals only
+            type_col = None
+            for cand in ["Type","type"]:
+                if cand in df_raw.columns:
+                    type_col = cand
+                    break
+            if type_col is not None:
+                try:
+                    melted = melted[df_raw[type_col].astype(str).str.lower().eq("actual")]
+                except Exception:
+                    pass
+            df_norm = melted
+        else:
+            missing = [k for k in required_keys if k not in effective_map]
+            raise ValueError(f"{name} missing required columns ({missing}). Available columns: {list(df_raw.columns)}")
+    else:
+        missing = [k for k in required_keys if k not in effective_map]
+        if missing:
+            raise ValueError(
+                f"{name} missing required columns ({missing}). Available columns: {list(df_raw.columns)}"
+            )
+        # Normalize required + optional columns via settings map where present
+        merged_map = {**effective_map, **{k: v for k, v in base_colmap.items() if k not in effective_map and v in df_raw.columns}}
+        df_norm = _normalize_schema(df_raw, merged_map)
+    # Coerce dtypes
+    df_norm["date"] = pd.to_datetime(df_norm["date"], errors="coerce")
+    df_norm["units"] = pd.to_numeric(df_norm["units"], errors="coerce")
+    df_norm = df_norm.dropna(subset=["date","units"]) 
+    return df_norm
+
+def _file_digest(fp: Path) -> str:
+    h = hashlib.sha256()
+    with open(fp, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _file_digest_cached(fp: Path) -> str:
+    """`_file_digest`, re-hashed only when the file's (size, mtime_ns) changed.
+
+    Stamps and digests are kept in data/cache/ingest/digests.json keyed by
+    resolved path, so a cache hit costs a stat instead of reading the file.
+    Thread workers update the index one at a time; each write goes through
+    its own temporary file, so concurrent processes never see a partial index.
+    """
+    st = fp.stat()
+    stamp = [st.st_size, st.st_mtime_ns]
+    key = str(fp.resolve())
+    hit = _read_digest_index().get(key)
+    if hit is not None and hit[:2] == stamp:
+        return hit[2]
+    digest = _file_digest(fp)
+    with _DIGEST_LOCK:
+        index = _read_digest_index()
+        index[key] = stamp + [digest]
+        _write_digest_index(index)
+    return digest
+
+def _read_digest_index() -> Dict:
+    try:
+        return json.loads(DIGEST_INDEX.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _write_digest_index(index: Dict) -> None:
+    """Atomically replace the digest index; a failed write only costs a re-hash later."""
+    tmp = None
+    try:
+        INGEST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=INGEST_CACHE_DIR, suffix=".tmp", delete=False) as f:
+            tmp = Path(f.name)
+            json.dump(index, f)
+        os.replace(tmp, DIGEST_INDEX)
+    except OSError:
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+
+def _cache_entry(fp: Path, colmap: Dict[str, str]) -> Tuple[str, Path]:
+    """Return (source prefix, parquet path) for a raw file and column map.
+
+    The prefix identifies the source file; the suffix is derived from the file
+    content and the column map, so any change to either yields a new entry.
+    """
+    prefix = _source_prefix(fp)
+    return prefix, INGEST_CACHE_DIR / f"{prefix}-{_content_key(fp, colmap)}.parquet"
+
+def _source_prefix(fp: Path) -> str:
+    source = hashlib.sha1(str(fp.resolve()).encode("utf-8")).hexdigest()[:12]
+    return f"{fp.stem}-{source}"
+
+def _content_key(fp: Path, colmap: Dict[str, str]) -> str:
+    key = hashlib.sha256(_file_digest_cached(fp).encode("utf-8"))
+    key.update(json.dumps(colmap, sort_keys=True).encode("utf-8"))
+    return key.hexdigest()[:20]
+
+def _load_file_cached(fp: Path, base_colmap: Dict[str, str]) -> pd.DataFrame:
+    """Content-addressed Parquet cache in front of `_load_file`.
+
+    Entries are keyed by file content hash plus column map; the hash is
+    recomputed only when the file's size or mtime changed. Writing a new entry
+    evicts older entries for the same source file. Caching is skipped silently
+    when Parquet support (pyarrow) is unavailable or the frame can't be stored.
+    """
+    prefix, entry = _cache_entry(fp, base_colmap)
+    if entry.exists():
+        try:
+            return pd.read_parquet(entry)
+        except Exception:
+            entry.unlink(missing_ok=True)
+    df_norm = _load_file(fp, base_colmap)
+    try:
+        INGEST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(".tmp")
+        df_norm.to_parquet(tmp, index=False)
+        tmp.replace(entry)
+    except Exception:
+        return df_norm
+    for stale in INGEST_CACHE_DIR.glob(f"{prefix}-*.parquet"):
+        if stale != entry:
+            stale.unlink(missing_ok=True)
+    return df_norm
+
+def clear_ingest_cache() -> None:
+    """Remove every cached normalized frame."""
+    if INGEST_CACHE_DIR.exists():
+        for fp in INGEST_CACHE_DIR.glob("*.parquet"):
+            fp.unlink(missing_ok=True)
+        DIGEST_INDEX.unlink(missing_ok=True)
+
+GRAIN_RANK = {"H": 0, "D": 1, "W": 2, "M": 3}
+
+def _detect_grain(dates: np.ndarray) -> str:
+    """Native sampling grain of a file from the median spacing of its distinct dates."""
+    uniq = np.unique(dates[~pd.isna(dates)])
+    if len(uniq) < 2:
+        return "D"
+    step = np.median(np.diff(uniq)) / np.timedelta64(1, "D")
+    if step < 1:
+        return "H"
+    if step < 6:
+        return "D"
+    if step < 25:
+        return "W"
+    return "M"
+
+def _label_units(days: np.ndarray, grain: str) -> np.ndarray:
+    """Period index of row labels (datetime64[D]) at `grain`: days, W-SUN weeks or months."""
+    d = days.astype("datetime64[D]")
+    if grain == "M":
+        # judge a month by its middle, whether it is labelled on the first or the last day
+        first = d.astype("datetime64[M]").astype("datetime64[D]") == d
+        d = d + np.where(first, 14, -14).astype("timedelta64[D]")
+        return d.astype("datetime64[M]").astype(np.int64)
+    n = d.astype(np.int64)
+    # 1970-01-01 is a Thursday: (n + 3) // 7 numbers the Monday..Sunday week ending on the row's W-SUN label
+    return (n + 3) // 7 if grain == "W" else n
+
+def _unit_days(units: np.ndarray, grain: str) -> Tuple[np.ndarray, np.ndarray]:
+    """First and last day (days since epoch) of each period index at `grain`."""
+    if grain == "M":
+        months = units.astype("datetime64[M]")
+        return (months.astype("datetime64[D]").astype(np.int64),
+                (months + 1).astype("datetime64[D]").astype(np.int64) - 1)
+    if grain == "W":
+        return 7 * units - 3, 7 * units + 3
+    return units, units
+
+def _units_within(first_day: np.ndarray, last_day: np.ndarray, grain: str, edges: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Range of `grain` periods a file must hold to fully cover the days first_day..last_day.
+
+    Days for daily/hourly files. For weekly files every week holding a day of
+    the span, or with `edges` off only the weeks lying entirely inside it
+    (the weeks straddling its edges are left out).
+    """
+    if grain == "W":
+        if edges:
+            return (first_day + 3) // 7, (last_day + 3) // 7
+        return -((-3 - first_day) // 7), (last_day - 3) // 7
+    if grain == "M":
+        return _unit_days_to_month(first_day), _unit_days_to_month(last_day)
+    return first_day, last_day
+
+def _unit_days_to_month(days: np.ndarray) -> np.ndarray:
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+def _unit_of_day(days: np.ndarray, grain: str) -> np.ndarray:
+    """Period index at `grain` holding each day (days since epoch)."""
+    if grain == "M":
+        return _unit_days_to_month(days)
+    return _label_units(days.astype("datetime64[D]"), grain)
+
+def _coverage_runs(keys: pd.DataFrame, units: np.ndarray) -> pd.DataFrame:
+    """Runs of consecutive periods per series: one (sku_id, region_id, first, last) row per gap-free stretch."""
+    frame = pd.DataFrame({"sku_id": keys["sku_id"].astype(str).to_numpy(),
+                          "region_id": keys["region_id"].astype(str).to_numpy(), "unit": units})
+    frame = frame.drop_duplicates().sort_values(["sku_id","region_id","unit"])
+    new_series = (frame[["sku_id","region_id"]] != frame[["sku_id","region_id"]].shift()).any(axis=1).to_numpy()
+    unit = frame["unit"].to_numpy()
+    run = np.cumsum(new_series | (np.diff(unit, prepend=unit[:1] if len(unit) else unit) != 1))
+    return (frame.assign(run=run).groupby("run", sort=False)
+            .agg(sku_id=("sku_id","first"), region_id=("region_id","first"), first=("unit","min"), last=("unit","max"))
+            .reset_index(drop=True))
+
+def _coverage_dict(grain: str, runs: pd.DataFrame) -> Dict:
+    return {
+        "grain": grain,
+        "sku_id": runs["sku_id"].tolist(),
+        "region_id": runs["region_id"].tolist(),
+        "first": runs["first"].astype(int).tolist(),
+        "last": runs["last"].astype(int).tolist(),
+    }
+
+def _coverage_from_frame(df_norm: pd.DataFrame, dates: np.ndarray) -> Dict:
+    grain = _detect_grain(dates)
+    days = df_norm["date"].to_numpy().astype("datetime64[D]")
+    return _coverage_dict(grain, _coverage_runs(df_norm, _label_units(days, grain)))
+
+def _file_coverage(fp: Path, base_colmap: Dict[str, str], chunksize=None) -> Dict:
+    """Grain and per-series runs of gap-free periods of a file, cached by content hash + column map.
+
+    Without `chunksize` the file is loaded through the normal (cached) loader,
+    so the scan doubles as the first read. With `chunksize` only the distinct
+    (series, day) labels are kept while streaming.
+    """
+    prefix = _source_prefix(fp)
+    entry = COVERAGE_DIR / f"{prefix}-v{COVERAGE_VERSION}-{_content_key(fp, base_colmap)}.json"
+    if entry.exists():
+        return json.loads(entry.read_text())
+    if chunksize:
+        labels, dates = [], []
+        for chunk in _iter_raw_chunks(fp, chunksize):
+            df_norm = _normalize_raw(chunk, base_colmap, fp.name)
+            dates.append(df_norm["date"].unique())
+            labels.append(df_norm[["sku_id","region_id"]].astype(str)
+                          .assign(day=df_norm["date"].to_numpy().astype("datetime64[D]")).drop_duplicates())
+        all_dates = np.concatenate(dates) if dates else np.array([], dtype="datetime64[ns]")
+        grain = _detect_grain(all_dates)
+        label = pd.concat(labels, ignore_index=True)
+        coverage = _coverage_dict(grain, _coverage_runs(label, _label_units(label["day"].to_numpy(), grain)))
+    else:
+        loader = _load_file_cached if getattr(settings, "ingest_cache", False) else _load_file
+        df_norm = loader(fp, base_colmap)
+        coverage = _coverage_from_frame(df_norm, df_norm["date"].unique())
+    COVERAGE_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in COVERAGE_DIR.glob(f"{prefix}-*.json"):
+        stale.unlink(missing_ok=True)
+    entry.write_text(json.dumps(coverage))
+    return coverage
+
+def _coverage_table(files: List[Path], base_colmap: Dict[str, str], chunksize=None) -> pd.DataFrame:
+    """One row per (file, series, gap-free run): grain, grain rank and first/last period index."""
+    rows = []
+    for fp in files:
+        cov = _file_coverage(fp, base_colmap, chunksize)
+        rows.append(pd.DataFrame({
+            "file": str(fp),
+            "grain": cov["grain"],
+            "rank": GRAIN_RANK[cov["grain"]],
+            "sku_id": cov["sku_id"],
+            "region_id": cov["region_id"],
+            "first": np.asarray(cov["first"], dtype=np.int64),
+            "last": np.asarray(cov["last"], dtype=np.int64),
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+def _fully_covered(sku: np.ndarray, region: np.ndarray, first_day: np.ndarray, last_day: np.ndarray,
+                   runs: pd.DataFrame, edges: bool = True) -> np.ndarray:
+    """True where some run in `runs` holds every period of its file's grain inside first_day..last_day.
+
+    With `edges` off, weeks straddling the span's edges need not be held (see `_units_within`).
+    """
+    out = np.zeros(len(sku), dtype=bool)
+    for grain, fine in runs.groupby("grain", sort=False):
+        lo, hi = _units_within(first_day, last_day, grain, edges)
+        probe = pd.DataFrame({"row": np.arange(len(sku)), "sku_id": sku, "region_id": region, "lo": lo, "hi": hi})
+        probe = probe[probe["lo"] <= probe["hi"]].merge(fine[["sku_id","region_id","first","last"]], on=["sku_id","region_id"])
+        out[probe.loc[(probe["first"] <= probe["lo"]) & (probe["last"] >= probe["hi"]), "row"].to_numpy()] = True
+    return out
+
+def _redundant_files(coverage: pd.DataFrame) -> List[str]:
+    """Files each of whose periods is fully covered by a finer-grained file for the same series."""
+    out = []
+    for f, own in coverage.groupby("file", sort=False):
+        finer = coverage[coverage["rank"] < own["rank"].iloc[0]]
+        if finer.empty:
+            continue
+        grain = own["grain"].iloc[0]
+        first_day, last_day = _unit_days(own["first"].to_numpy(), grain)[0], _unit_days(own["last"].to_numpy(), grain)[1]
+        if _fully_covered(own["sku_id"].to_numpy(), own["region_id"].to_numpy(), first_day, last_day, finer).all():
+            out.append(f)
+    return out
+
+def _uncovered_coarse(sku: np.ndarray, region: np.ndarray, unit: np.ndarray, grain: str,
+                      coverage: pd.DataFrame) -> np.ndarray:
+    """True where a `grain` file has a row for period `unit` of the series that no finer file resolves."""
+    out = np.zeros(len(sku), dtype=bool)
+    probe = pd.DataFrame({"row": np.arange(len(sku)), "sku_id": sku, "region_id": region, "unit": unit})
+    probe = probe.merge(coverage.loc[coverage["grain"] == grain, ["sku_id","region_id","first","last"]], on=["sku_id","region_id"])
+    rows = probe.loc[(probe["first"] <= probe["unit"]) & (probe["last"] >= probe["unit"]), ["row","unit"]].drop_duplicates("row")
+    if rows.empty:
+        return out
+    idx = rows["row"].to_numpy()
+    c_first, c_last = _unit_days(rows["unit"].to_numpy(), grain)
+    finer = coverage[coverage["rank"] < GRAIN_RANK[grain]]
+    out[idx] = ~_fully_covered(sku[idx], region[idx], c_first, c_last, finer, edges=False)
+    return out
+
+def _drop_coarser_rows(df_norm: pd.DataFrame, fp: Path, coverage: pd.DataFrame) -> pd.DataFrame:
+    """Keep exactly one grain per series and period.
+
+    A period is resolved when a finer-grained file holds every finer period
+    inside it for the same series (every day, or every week with no gaps).
+    A finer row is dropped when each coarser period it touches has a coarser
+    row and is unresolved, so partially covered periods keep the coarser
+    total. Weeks straddling a month edge hold days of both months, so a
+    coarser row keeps the share of its units for the days that no staying
+    finer row holds (e.g. Dec 30-31 when the week ending Jan 5 is missing)
+    and is dropped when none are left.
+    """
+    own = coverage[coverage["file"] == str(fp)]
+    if own.empty or df_norm.empty:
+        return df_norm
+    grain, rank = own["grain"].iloc[0], own["rank"].iloc[0]
+    sku = df_norm["sku_id"].astype(str).to_numpy()
+    region = df_norm["region_id"].astype(str).to_numpy()
+    first_day, last_day = _unit_days(_label_units(df_norm["date"].to_numpy().astype("datetime64[D]"), grain), grain)
+    n_days = last_day - first_day + 1
+    finer = coverage[coverage["rank"] < rank]
+    resolved = _fully_covered(sku, region, first_day, last_day, finer, edges=False)
+    # days of each row held by finer rows of one grain: its inner periods when resolved, plus staying edge periods
+    held = np.zeros(len(sku), dtype=np.int64)
+    for fine_grain, fine in finer.groupby("grain", sort=False):
+        inner = np.where(_fully_covered(sku, region, first_day, last_day, fine, edges=False), n_days, 0)
+        edge_held = np.zeros(len(sku), dtype=np.int64)
+        for edge, outer in [(first_day, first_day - 1), (last_day, last_day + 1)]:
+            f_first, f_last = _unit_days(_unit_of_day(edge, fine_grain), fine_grain)
+            inside = np.where((f_first <= outer) & (f_last >= outer),
+                              np.minimum(f_last, last_day) - np.maximum(f_first, first_day) + 1, 0)
+            if not inside.any():
+                continue
+            # the edge period's own row, or the even finer rows replacing it (those stay only inside resolved rows)
+            split = _fully_covered(sku, region, f_first, f_last, coverage[coverage["rank"] < GRAIN_RANK[fine_grain]])
+            stays = ((_fully_covered(sku, region, f_first, f_last, fine) | split)
+                     & (resolved | (~split & ~_uncovered_coarse(sku, region, _unit_of_day(outer, grain), grain, coverage))))
+            inner -= np.where(inner > 0, inside, 0)
+            edge_held += np.where(stays, inside, 0)
+        held = np.maximum(held, inner + edge_held)
+    for coarse_grain in coverage.loc[coverage["rank"] > rank, "grain"].unique():
+        # unresolved coarser rows on both sides keep their totals
+        held = np.where(_uncovered_coarse(sku, region, _unit_of_day(first_day, coarse_grain), coarse_grain, coverage)
+                        & _uncovered_coarse(sku, region, _unit_of_day(last_day, coarse_grain), coarse_grain, coverage),
+                        n_days, held)
+    keep = held < n_days
+    out = df_norm[keep]
+    if held[keep].any():
+        out = out.assign(units=out["units"] * (1 - held[keep] / n_days[keep]))
+    return out
+
+def _plan_dedup(files: List[Path], base_colmap: Dict[str, str], chunksize=None) -> Tuple[List[Path], pd.DataFrame]:
+    """Files still worth reading plus the coverage used to drop coarser duplicates."""
+    coverage = _coverage_table(files, base_colmap, chunksize)
+    redundant = set(_redundant_files(coverage))
+    return [fp for fp in files if str(fp) not in redundant], coverage
+
+def _load_files(files: List[Path], base_colmap: Dict[str, str]) -> List[pd.DataFrame]:
+    """Load and normalize files, optionally on a thread or process pool.
+
+    Frames are returned in the order of `files` regardless of completion order,
+    so the parallel path yields exactly the serial result.
+    """
+    loader = _load_file_cached if getattr(settings, "ingest_cache", False) else _load_file
+    workers = min(int(getattr(settings, "ingest_workers", 1) or 1), len(files))
+    if workers <= 1:
+        return [loader(fp, base_colmap) for fp in files]
+    if getattr(settings, "ingest_executor", "thread") == "process":
+        # spawned/forkserver workers import a fresh `settings`; ship the parent's values with each task
+        overrides = dict(vars(settings))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_load_file_in_worker, files, [base_colmap] * len(files),
+                                 [overrides] * len(files), [loader is _load_file_cached] * len(files)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(loader, files, [base_colmap] * len(files)))
+
+def _load_file_in_worker(fp: Path, base_colmap: Dict[str, str], overrides: Dict, cached: bool) -> pd.DataFrame:
+    """Process-pool task: apply the parent's settings, then load one file."""
+    vars(settings).update(overrides)
+    return (_load_file_cached if cached else _load_file)(fp, base_colmap)
+
+def _iter_raw_chunks(fp: Path, chunksize: int):
+    """Yield raw frames of at most `chunksize` rows; true Excel workbooks come back whole."""
+    if sniff_format(fp) != "csv":
+        yield _read_table(fp)
+        return
+    with pd.read_csv(fp, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk
+
+def _filter_series(df: pd.DataFrame, series) -> pd.DataFrame:
+    """Keep rows whose (sku_id, region_id) is selected by `series`.
+
+    `series` is either a predicate ``f(sku_id, region_id) -> bool``, evaluated
+    once per distinct key, or an iterable of sku ids and/or
+    ``(sku_id, region_id)`` tuples.
+    """
+    keys = pd.MultiIndex.from_frame(df[["sku_id","region_id"]])
+    if callable(series):
+        uniq = keys.unique()
+        chosen = uniq[[bool(series(sku, region)) for sku, region in uniq]]
+        return df[keys.isin(chosen)]
+    items = list(series)
+    pairs = [tuple(x) for x in items if isinstance(x, tuple)]
+    skus = [x for x in items if not isinstance(x, tuple)]
+    mask = df["sku_id"].isin(skus).to_numpy()
+    if pairs:
+        mask = mask | keys.isin(pairs)
+    return df[mask]
+
+def _date_bounds(start=None, end=None) -> Optional[Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]]:
+    """Raw-date bounds [lo, hi) selecting exactly the W-SUN weeks that end within [start, end]."""
+    if start is None and end is None:
+        return None
+    lo = hi = None
+    if start is not None:
+        start = pd.Timestamp(start).normalize()
+        lo = start + pd.Timedelta(days=(6 - start.dayofweek) % 7 - 6)
+    if end is not None:
+        end = pd.Timestamp(end).normalize()
+        hi = end - pd.Timedelta(days=(end.dayofweek + 1) % 7 - 1)
+    return lo, hi
+
+def _filter_dates(df: pd.DataFrame, bounds) -> pd.DataFrame:
+    lo, hi = bounds
+    dates = pd.to_datetime(df["date"], errors="coerce")
+    mask = pd.Series(True, index=df.index)
+    if lo is not None:
+        mask &= dates >= lo
+    if hi is not None:
+        mask &= dates < hi
+    return df[mask]
+
+def _load_sales_sql(path, table: str, colmap: Dict[str, str], series=None, bounds=None) -> pd.DataFrame:
+    part = sql_source.load_weekly_partials(path, table, colmap, series, bounds)
+    if part.empty:
+        raise ValueError(f"No rows with a valid date and units found in table {table!r} of {path}")
+    return _finalize_week_partials(part)
+
+def _load_sales_streaming(files: List[Path], base_colmap: Dict[str, str], chunksize: int, series=None, coverage=None, bounds=None) -> pd.DataFrame:
+    """Chunked ingest that folds chunks into running weekly partials.
+
+    Chunk partials are collected and folded every STREAM_FOLD_CHUNKS chunks,
+    so the running frame is re-aggregated once per batch instead of once per
+    chunk. Peak memory is bounded by the number of distinct series-weeks plus
+    one batch of chunk partials, instead of by the full raw row count. With a
+    `series` filter, unselected rows are dropped chunk by chunk and never
+    reach aggregation; `bounds` from `_date_bounds` trims raw rows the same way.
+    """
+    parts = []
+    for fp in files:
+        for chunk in _iter_raw_chunks(fp, chunksize):
+            df_norm = _normalize_raw(chunk, base_colmap, fp.name)
+            if series is not None:
+                df_norm = _filter_series(df_norm, series)
+            if bounds is not None:
+                df_norm = _filter_dates(df_norm, bounds)
+            if coverage is not None:
+                df_norm = _drop_coarser_rows(df_norm, fp, coverage)
+            if df_norm.empty:
+                continue
+            parts.append(_partial_week_agg(df_norm))
+            if len(parts) > STREAM_FOLD_CHUNKS:
+                parts = [_combine_week_partials(parts)]
+    if not parts:
+        raise ValueError(f"No rows with a valid date and units found in {[fp.name for fp in files]}")
+    return _finalize_week_partials(parts[0] if len(parts) == 1 else _combine_week_partials(parts))
+
+def _read_store_manifest(colmap: Dict[str, str], source: Path, digests: Dict[Path, str]) -> Dict:
+    """Return the weekly store manifest, resetting the store if its source or column map changed.
+
+    The store is keyed by the resolved source path and the column map and
+    records the digest of every ingested file by path; a recorded file that
+    is no longer among `digests` (deleted or renamed) also resets it.
+    """
+    key = hashlib.sha256(json.dumps([str(source.resolve()), colmap], sort_keys=True).encode("utf-8")).hexdigest()
+    manifest_fp = WEEKLY_STORE_DIR / "manifest.json"
+    if manifest_fp.exists():
+        manifest = json.loads(manifest_fp.read_text())
+        current = {str(fp.resolve()) for fp in digests}
+        if manifest.get("key") == key and set(manifest.get("files", {})) <= current:
+            return manifest
+    reset_weekly_store()
+    return {"key": key, "files": {}, "segments": 0}
+
+def _read_store_segments() -> pd.DataFrame:
+    segments = sorted(WEEKLY_STORE_DIR.glob("segment-*.parquet"))
+    parts = pd.concat([pd.read_parquet(fp) for fp in segments], ignore_index=True, sort=False)
+    # A later segment carries the re-aggregated value of any boundary week it touched
+    return parts.drop_duplicates(subset=WEEK_KEYS, keep="last")
+
+def _compact_store_segments(manifest: Dict) -> None:
+    """Rewrite the store as one segment once it holds more than WEEKLY_STORE_MAX_SEGMENTS."""
+    if manifest["segments"] <= WEEKLY_STORE_MAX_SEGMENTS:
+        return
+    merged = _read_store_segments()
+    tmp = WEEKLY_STORE_DIR / "compacted.tmp"
+    merged.to_parquet(tmp, index=False)
+    for fp in WEEKLY_STORE_DIR.glob("segment-*.parquet"):
+        fp.unlink()
+    tmp.replace(WEEKLY_STORE_DIR / "segment-000000.parquet")
+    manifest["segments"] = 1
+
+def reset_weekly_store() -> None:
+    """Drop the persisted weekly store so the next incremental load starts from scratch."""
+    if WEEKLY_STORE_DIR.exists():
+        for fp in WEEKLY_STORE_DIR.iterdir():
+            fp.unlink(missing_ok=True)
+
+def _load_sales_incremental(files: List[Path], base_colmap: Dict[str, str], coverage=None) -> pd.DataFrame:
+    """Append-only ingest into a persisted weekly store.
+
+    The store keeps weekly partials as Parquet segments plus, per
+    (sku_id, region_id), the latest raw timestamp seen (the watermark) and the
+    partial of the week containing it. Files already ingested are skipped by
+    path and content hash; rows at or before their series' watermark are
+    ignored. New rows are aggregated on their own and only the boundary week
+    is merged with its stored partial, so a refresh costs O(new rows +
+    series). A different source path or column map, or a file gone from the
+    source, rebuilds the store; segments are compacted past
+    WEEKLY_STORE_MAX_SEGMENTS.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Incremental ingest stores weekly segments as Parquet and requires 'pyarrow'.")
+    digests = {fp: _file_digest_cached(fp) for fp in files}
+    manifest = _read_store_manifest(base_colmap, Path(settings.csv_path), digests)
+    new_files = [fp for fp in files if manifest["files"].get(str(fp.resolve())) != digests[fp]]
+    wm_fp = WEEKLY_STORE_DIR / "watermarks.parquet"
+    if new_files:
+        frames = _load_files(new_files, base_colmap)
+        if coverage is not None:
+            frames = [_drop_coarser_rows(fr, fp, coverage) for fp, fr in zip(new_files, frames)]
+        df_new = pd.concat(frames, ignore_index=True, sort=False)
+        wm = pd.read_parquet(wm_fp) if wm_fp.exists() else None
+        if wm is not None:
+            df_new = df_new.merge(wm[["sku_id","region_id","watermark"]], on=["sku_id","region_id"], how="left")
+            df_new = df_new[df_new["watermark"].isna() | (df_new["date"] > df_new["watermark"])]
+            df_new = df_new.drop(columns="watermark")
+        if not df_new.empty:
+            part = _partial_week_agg(df_new)
+            if wm is not None:
+                boundary = wm.drop(columns="watermark").merge(part[WEEK_KEYS], on=WEEK_KEYS)
+                part = _combine_week_partials([boundary, part])
+            WEEKLY_STORE_DIR.mkdir(parents=True, exist_ok=True)
+            part.to_parquet(WEEKLY_STORE_DIR / f"segment-{manifest['segments']:06d}.parquet", index=False)
+            manifest["segments"] += 1
+            # New boundary: the last week of each touched series, tagged with its latest raw timestamp
+            latest = df_new.groupby(["sku_id","region_id"])["date"].max().rename("watermark").reset_index()
+            latest["date"] = _week_end(latest["watermark"])
+            new_wm = part.merge(latest, on=WEEK_KEYS)
+            if wm is not None:
+                untouched = wm.merge(latest[["sku_id","region_id"]], on=["sku_id","region_id"], how="left", indicator=True)
+                untouched = untouched[untouched["_merge"] == "left_only"].drop(columns="_merge")
+                new_wm = pd.concat([untouched, new_wm], ignore_index=True, sort=False)
+            new_wm.to_parquet(wm_fp, index=False)
+        manifest["files"].update({str(fp.resolve()): digests[fp] for fp in new_files})
+        WEEKLY_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        _compact_store_segments(manifest)
+        (WEEKLY_STORE_DIR / "manifest.json").write_text(json.dumps(manifest))
+    if manifest["segments"] == 0:
+        raise ValueError(f"No rows with a valid date and units found in {[fp.name for fp in files]}")
+    return _finalize_week_partials(_read_store_segments())
+
+def load_sales(sample: bool = True, series=None, start=None, end=None) -> pd.DataFrame:
+    """Load weekly sales per (sku_id, region_id).
+
+    `series` restricts the load to a subset of series: an iterable of sku ids
+    and/or ``(sku_id, region_id)`` tuples, a predicate
+    ``f(sku_id, region_id) -> bool``, or an int N for the first N series in
+    sorted order. `start`/`end` keep only weeks ending within that date
+    range. Both filters are applied while reading, so unselected rows are
+    never aggregated or returned. When ``settings.sql_path`` points at a
+    SQLite or DuckDB file, the filters and the weekly aggregation run in SQL.
+    """
     ensure_dirs()
+    bounds = _date_bounds(start, end)
     if sample or settings.use_sample:
         sales, _ = generate_sample_data()
-        return sales
+        if isinstance(series, int):
+            keys = sales[["sku_id","region_id"]].drop_duplicates().sort_values(["sku_id","region_id"]).head(series)
+            series = list(keys.itertuples(index=False, name=None))
+        if series is not None:
+            sales = _filter_series(sales, series).reset_index(drop=True)
+        if bounds is not None:
+            sales = _filter_dates(sales, bounds).reset_index(drop=True)
+        return encode_ids(sales)
+    sql_path = getattr(settings, "sql_path", None)
+    if sql_path:
+        df_week = _load_sales_sql(sql_path, getattr(settings, "sql_table", "sales"), settings.column_map, series, bounds)
+        return encode_ids(df_week.sort_values(["sku_id","region_id","date"]).reset_index(drop=True))
     path = Path(settings.csv_path)
     if not path.exists():
         raise FileNotFoundError(f"Path not found: {path}. Update settings.csv_path.")
@@ -136,77 +830,40 @@ def load_sales(sample: bool = True) -> pd.DataFrame:
     if not files:
         raise FileNotFoundError(f"No data files found under {path} (csv/xlsx/xls).")
     base_colmap: Dict[str, str] = settings.column_map
-    required_keys = ["date","sku_id","region_id","units"]
-    frames: List[pd.DataFrame] = []
-    for fp in files:
-        df_raw = _read_table(fp)
-        # Build per-file column map: auto-detected, overridden by settings.column_map when present
-        auto_map = _auto_detect_columns(df_raw)
-        effective_map: Dict[str, str] = {}
-        for k in required_keys:
-            # prefer settings mapping if the target exists in file; else use auto-detected
-            if k in base_colmap and base_colmap[k]:
-                val = base_colmap[k]
-                if val.lower().strip() in {c.lower().strip() for c in df_raw.columns}:
-                    effective_map[k] = val
-                    continue
-            if k in auto_map:
-                effective_map[k] = auto_map[k]
-        # Handle wide format: if units not identified but there are many product columns, melt
-        if "units" not in effective_map and "sku_id" not in effective_map:
-            lower_cols = {c.lower().strip(): c for c in df_raw.columns}
-            date_col = effective_map.get("date") or auto_map.get("date")
-            region_col = effective_map.get("region_id") or auto_map.get("region_id")
-            known_meta = {x for x in [date_col, region_col, "year", "month", "hour", "weekday", "weekday name", "type"] if x}
-            product_cols = [c for c in df_raw.columns if c not in known_meta]
-            if date_col and product_cols:
-                id_vars = [date_col]
-                if region_col and region_col in df_raw.columns:
-                    id_vars.append(region_col)
-                melted = df_raw.melt(id_vars=id_vars, value_vars=product_cols, var_name="sku_id", value_name="units")
-                melted = melted.rename(columns={date_col: "date"})
-                if region_col and region_col in melted.columns:
-                    melted = melted.rename(columns={region_col: "region_id"})
-                if "region_id" not in melted.columns:
-                    melted["region_id"] = "All"
-                # If Type column exists, keep Actuals only
-                type_col = None
-                for cand in ["Type","type"]:
-                    if cand in df_raw.columns:
-                        type_col = cand
-                        break
-                if type_col is not None:
-                    try:
-                        melted = melted[df_raw[type_col].astype(str).str.lower().eq("actual")]
-                    except Exception:
-                        pass
-                df_norm = melted
-            else:
-                missing = [k for k in required_keys if k not in effective_map]
-                raise ValueError(f"{fp.name} missing required columns ({missing}). Available columns: {list(df_raw.columns)}")
-        else:
-            missing = [k for k in required_keys if k not in effective_map]
-            if missing:
-                raise ValueError(
-                    f"{fp.name} missing required columns ({missing}). Available columns: {list(df_raw.columns)}"
-                )
-            # Normalize required + optional columns via settings map where present
-            merged_map = {**effective_map, **{k: v for k, v in base_colmap.items() if k not in effective_map and v in df_raw.columns}}
-            df_norm = _normalize_schema(df_raw, merged_map)
-        # Coerce dtypes
-        df_norm["date"] = pd.to_datetime(df_norm["date"], errors="coerce")
-        df_norm["units"] = pd.to_numeric(df_norm["units"], errors="coerce")
-        df_norm = df_norm.dropna(subset=["date","units"]) 
-        frames.append(df_norm)
+    chunksize = getattr(settings, "ingest_chunksize", None)
+    if series is not None or bounds is not None:
+        chunksize = chunksize or SERIES_FILTER_CHUNKSIZE
+    coverage = None
+    if getattr(settings, "dedup_granularity", False):
+        files, coverage = _plan_dedup(files, base_colmap, chunksize)
+    if series is not None or bounds is not None:
+        if isinstance(series, int):
+            # keys come from the cached per-file coverage, not from re-reading the data
+            keys = _coverage_table(files, base_colmap, chunksize)[["sku_id","region_id"]].drop_duplicates()
+            keys = keys.sort_values(["sku_id","region_id"]).head(series)
+            series = list(keys.itertuples(index=False, name=None))
+        df_week = _load_sales_streaming(files, base_colmap, int(chunksize), series, coverage, bounds)
+        return encode_ids(df_week.sort_values(["sku_id","region_id","date"]).reset_index(drop=True))
+    if getattr(settings, "ingest_incremental", False):
+        df_week = _load_sales_incremental(files, base_colmap, coverage)
+        return encode_ids(df_week.sort_values(["sku_id","region_id","date"]).reset_index(drop=True))
+    if chunksize:
+        df_week = _load_sales_streaming(files, base_colmap, int(chunksize), coverage=coverage)
+        return encode_ids(df_week.sort_values(["sku_id","region_id","date"]).reset_index(drop=True))
+    frames = _load_files(files, base_colmap)
+    if coverage is not None:
+        frames = [_drop_coarser_rows(fr, fp, coverage) for fp, fr in zip(files, frames)]
     df_all = pd.concat(frames, ignore_index=True, sort=False)
     df_week = _aggregate_to_week(df_all)
     df_week = df_week.sort_values(["sku_id","region_id","date"]).reset_index(drop=True)
-    return df_week
+    return encode_ids(df_week)
 
 def validate_sales(df: pd.DataFrame) -> pd.DataFrame:
     required = ["date","sku_id","region_id","units"]
     missing = [c for c in required if c not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
-    df = df.sort_values(["sku_id","region_id","date"]).copy()
+    df = encode_ids(df).sort_values(["sku_id","region_id","date"])
+    if getattr(settings, "quality_report", False):
+        save_quality_report(quality_report(df))
     return df
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from src.utils.config import settings
+
+PANEL_FIELDS = ["units","price","discount","promo_flag","stockout_flag"]
+
+
+class WeeklyPanel:
+    """Dense weekly panel: one ``[n_series, n_weeks]`` array per field.
+
+    Rows are (sku_id, region_id) series, columns are W-SUN weeks shared by all
+    series. Weeks outside a series' first..last observed week hold NaN. Arrays
+    loaded with `load_panel` are read-only memory maps, and every accessor
+    returns views into them, so per-series work never copies or filters a
+    long DataFrame.
+    """
+
+    def __init__(self, index: pd.DataFrame, weeks: pd.DatetimeIndex, arrays: Dict[str, np.ndarray]):
+        self.index = index.reset_index(drop=True)
+        self.weeks = weeks
+        self.arrays = arrays
+        self._rows = {key: i for i, key in enumerate(zip(self.index["sku_id"], self.index["region_id"]))}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.index), len(self.weeks)
+
+    def row(self, sku_id, region_id) -> int:
+        try:
+            return self._rows[(sku_id, region_id)]
+        except KeyError:
+            raise KeyError(f"Series not in panel: sku_id={sku_id!r}, region_id={region_id!r}")
+
+    def span(self, row: int) -> slice:
+        """Column slice from the series' first to last observed week."""
+        return slice(int(self.index.at[row, "first"]), int(self.index.at[row, "last"]) + 1)
+
+    def values(self, field: str, row: int, trim: bool = True) -> np.ndarray:
+        """Zero-copy view of one series for `field`."""
+        arr = self.arrays[field]
+        return arr[row, self.span(row)] if trim else arr[row]
+
+    def series(self, field: str, row: int) -> pd.Series:
+        """Date-indexed Series over the trimmed row view (no copy of the data)."""
+        sl = self.span(row)
+        return pd.Series(self.arrays[field][row, sl], index=self.weeks[sl], name=field, copy=False)
+
+    def iter_rows(self) -> Iterator[Tuple[int, object, object]]:
+        for i, (sku, region) in enumerate(zip(self.index["sku_id"], self.index["region_id"])):
+            yield i, sku, region
+
+    def to_frame(self) -> pd.DataFrame:
+        """Back to the long weekly frame (only each series' observed span)."""
+        n_series, n_weeks = self.shape
+        rows, cols = np.divmod(np.arange(n_series * n_weeks), n_weeks)
+        keep = (cols >= self.index["first"].to_numpy()[rows]) & (cols <= self.index["last"].to_numpy()[rows])
+        rows, cols = rows[keep], cols[keep]
+        out = pd.DataFrame({
+            "sku_id": self.index["sku_id"].to_numpy()[rows],
+            "region_id": self.index["region_id"].to_numpy()[rows],
+            "date": self.weeks[cols],
+        })
+        for field, arr in self.arrays.items():
+            out[field] = np.asarray(arr[rows, cols])
+        return out
+
+
+def build_panel(df: pd.DataFrame, fields: Optional[List[str]] = None) -> WeeklyPanel:
+    """Scatter a long weekly frame (as returned by `load_sales`) into dense arrays."""
+    fields = [f for f in (fields or PANEL_FIELDS) if f in df.columns]
+    dates = pd.to_datetime(df["date"])
+    start = dates.min()
+    offsets = (dates - start) // pd.Timedelta(days=1)
+    if (offsets % 7 != 0).any():
+        raise ValueError("build_panel expects weekly dates on a common weekday (run load_sales first).")
+    cols = (offsets // 7).to_numpy()
+    weeks = pd.date_range(start, periods=int(cols.max()) + 1, freq=pd.Timedelta(weeks=1))
+    grouped = df.groupby(["sku_id","region_id"], sort=True, observed=True)
+    rows = grouped.ngroup().to_numpy()
+    index = grouped.size().index.to_frame(index=False)
+    col_s = pd.Series(cols)
+    index["first"] = col_s.groupby(rows).min().to_numpy()
+    index["last"] = col_s.groupby(rows).max().to_numpy()
+    dtype = np.float32 if getattr(settings, "precision", "double") == "lean" else np.float64
+    arrays: Dict[str, np.ndarray] = {}
+    for field in fields:
+        arr = np.full((len(index), len(weeks)), np.nan, dtype=dtype)
+        arr[rows, cols] = df[field].to_numpy(dtype=dtype, na_value=np.nan)
+        arrays[field] = arr
+    return WeeklyPanel(index, weeks, arrays)
+
+
+def save_panel(panel: WeeklyPanel, path: Union[str, Path, None] = None) -> Path:
+    path = Path(path or settings.panel_path)
+    path.mkdir(parents=True, exist_ok=True)
+    for field, arr in panel.arrays.items():
+        np.save(path / f"{field}.npy", np.ascontiguousarray(arr))
+    meta = {
+        "fields": list(panel.arrays),
+        "weeks": [d.strftime("%Y-%m-%d") for d in panel.weeks],
+        # native JSON values, so numeric ids load back as numbers and row() lookups still match
+        "sku_id": panel.index["sku_id"].tolist(),
+        "region_id": panel.index["region_id"].tolist(),
+        "first": panel.index["first"].astype(int).tolist(),
+        "last": panel.index["last"].astype(int).tolist(),
+    }
+    (path / "index.json").write_text(json.dumps(meta, default=str))
+    return path
+
+
+def load_panel(path: Union[str, Path, None] = None, mmap: bool = True) -> WeeklyPanel:
+    """Load a saved panel; with `mmap` the arrays are read-only memory maps."""
+    path = Path(path or settings.panel_path)
+    meta = json.loads((path / "index.json").read_text())
+    index = pd.DataFrame({k: meta[k] for k in ["sku_id","region_id","first","last"]})
+    if getattr(settings, "categorical_ids", False):
+        index = index.astype({"sku_id": "category", "region_id": "category"})
+    weeks = pd.DatetimeIndex(pd.to_datetime(meta["weeks"]))
+    arrays = {f: np.load(path / f"{f}.npy", mmap_mode="r" if mmap else None) for f in meta["fields"]}
+    return WeeklyPanel(index, weeks, arrays)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import pandas as pd
+from pathlib import Path
+from typing import IO, List, Sequence, Union
+from src.data.columns import LAST_COLS, MAX_COLS, MEAN_COLS, WEEK_KEYS
+
+
+def _polars():
+    try:
+        import polars as pl
+    except ImportError:
+        raise ImportError("settings.backend = 'polars' requires the 'polars' package (pip install polars).")
+    return pl
+
+
+def _datetime_unit() -> str:
+    # Resolution pandas gives parsed date strings, so Arrow-read dates match the pandas reader
+    return pd.to_datetime(pd.Series(["2000-01-01"])).dt.unit
+
+
+def read_csv_arrow(source: Union[Path, str, IO[bytes]]) -> pd.DataFrame:
+    """Read a CSV with Arrow's multi-threaded reader and hand back pandas.
+
+    Date and naive timestamp columns are cast to the resolution the pandas
+    reader would produce, so downstream normalization sees the same frame.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    table = pacsv.read_csv(source, read_options=pacsv.ReadOptions(use_threads=True))
+    unit = _datetime_unit()
+    for i, field in enumerate(table.schema):
+        if pa.types.is_date(field.type) or (pa.types.is_timestamp(field.type) and field.type.tz is None):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.timestamp(unit)))
+    return table.to_pandas()
+
+
+def aggregate_to_week(df: pd.DataFrame) -> pd.DataFrame:
+    """Polars lazy group-by version of `ingest._aggregate_to_week` (same output frame)."""
+    pl = _polars()
+    cols = WEEK_KEYS + ["units"] + [c for c in MEAN_COLS + MAX_COLS + LAST_COLS if c in df.columns]
+    work = df[cols].assign(date=pd.to_datetime(df["date"], errors="coerce"))
+    unit = work["date"].dt.unit
+    lf = pl.from_pandas(work).lazy().with_columns(
+        pl.col("sku_id").cast(pl.String),
+        pl.col("region_id").cast(pl.String),
+    ).filter(pl.col("date").is_not_null())
+    day = pl.col("date").dt.truncate("1d")
+    lf = lf.with_columns(
+        pl.col("date").alias("__ts"),
+        (day + pl.duration(days=(7 - day.dt.weekday()) % 7)).alias("date"),
+    )
+    aggs = [pl.col("units").sum()]
+    aggs += [pl.col(c).mean() for c in MEAN_COLS if c in cols]
+    aggs += [pl.col(c).max() for c in MAX_COLS if c in cols]
+    aggs += [pl.col(c).sort_by("__ts", maintain_order=True).drop_nulls().last()
+             for c in LAST_COLS if c in cols]
+    weekly = lf.group_by(WEEK_KEYS).agg(aggs)
+    # every week between each series' first and last week, empty ones with zero units
+    full = (
+        weekly.group_by(["sku_id","region_id"])
+        .agg(pl.col("date").min().alias("start"), pl.col("date").max().alias("end"))
+        .with_columns(pl.datetime_ranges("start", "end", interval="1w", time_unit=unit).alias("date"))
+        .explode("date")
+        .select(WEEK_KEYS)
+    )
+    out = (
+        full.join(weekly, on=WEEK_KEYS, how="left")
+        .with_columns(pl.col("units").fill_null(0.0))
+        .sort(WEEK_KEYS)
+        .collect()
+    )
+    return _to_pandas(out)
+
+
+def lag_roll_features(y: pd.Series, keys: pd.DataFrame, lags: Sequence[int], windows: Sequence[int]) -> pd.DataFrame:
+    """Lag/rolling columns for `y`, with rows already ordered by series and date.
+
+    Lags shift within each series and rolling windows (over the previous
+    values) stay inside each series, as in `build_features.add_lag_roll`.
+    """
+    pl = _polars()
+    key_cols = list(keys.columns)
+    frame = pl.from_pandas(pd.concat([keys.reset_index(drop=True), y.reset_index(drop=True).rename("__y")], axis=1))
+    lf = frame.lazy().with_columns(pl.col("__y").shift(1).over(key_cols).alias("__shift"))
+    exprs: List = [pl.col("__y").shift(lag).over(key_cols).alias(f"lag_{lag}") for lag in lags]
+    for win in windows:
+        exprs.append(pl.col("__shift").rolling_mean(win).over(key_cols).alias(f"rollmean_{win}"))
+        exprs.append(pl.col("__shift").rolling_std(win).over(key_cols).alias(f"rollstd_{win}"))
+    out = lf.select(exprs).collect()
+    return _to_pandas(out).set_axis(y.index)
+
+
+def _to_pandas(frame) -> pd.DataFrame:
+    out = frame.to_pandas()
+    for c in out.columns:
+        if out[c].dtype == object:
+            out[c] = out[c].astype(str).where(out[c].notna())
+    return out
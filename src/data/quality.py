@@ -0,0 +1,122 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional, Union
+from src.utils.config import settings
+
+QUALITY_PATH = Path("data/outputs/data_quality.csv")
+
+# Thresholds behind the `issues` column
+MIN_OBS = 30             # fewer periods than this is "short" (training skips these)
+FLAT_RUN_MIN = 8         # identical consecutive values for this many periods is a "flat_run"
+OUTLIER_Z = 3.5          # robust z-score (median/MAD) above which a point is an outlier
+INTERMITTENT_SHARE = 0.5 # zero-unit share at or above which a series is "intermittent"
+STOCKOUT_SHARE = 0.1     # stockout-flagged share above which a series is flagged
+
+QUALITY_COLUMNS = [
+    "sku_id","region_id","n_obs","first_date","last_date","duplicates","negative_units",
+    "missing_units","missing_periods","max_gap","max_flat_run","zero_share","outliers",
+    "stockout_share","issues",
+]
+
+
+def quality_report(df: pd.DataFrame, freq: Optional[str] = None) -> pd.DataFrame:
+    """One row per (sku_id, region_id) summarising data problems.
+
+    Expects `df` sorted by sku_id, region_id, date (as `validate_sales`
+    leaves it) and works on whole columns at once: series boundaries come
+    from one ngroup, every per-row check is a numpy comparison against the
+    previous row, and per-series totals are bincounts. Gaps are counted in
+    periods of `freq` (default ``settings.frequency``).
+    """
+    freq = freq or settings.frequency
+    n = len(df)
+    if n == 0:
+        return pd.DataFrame(columns=QUALITY_COLUMNS)
+    sid = df.groupby(["sku_id","region_id"], sort=False, observed=True).ngroup().to_numpy()
+    start = np.r_[True, sid[1:] != sid[:-1]]
+    end = np.r_[start[1:], True]
+    n_series = int(sid.max()) + 1
+    counts = np.bincount(sid, minlength=n_series)
+
+    dates = pd.DatetimeIndex(pd.to_datetime(df["date"]))
+    step = np.diff(pd.PeriodIndex(dates, freq=freq).asi8, prepend=0)
+    step[start] = 1
+    gap = np.where(step > 1, step - 1, 0)
+    ns = dates.asi8
+    dup = ~start & (ns == np.r_[ns[0], ns[:-1]])
+
+    units = df["units"].to_numpy(dtype=float, na_value=np.nan)
+    prev = np.r_[np.nan, units[:-1]]
+    run_start = start | (units != prev)
+    run_len = np.diff(np.r_[np.flatnonzero(run_start), n])
+    run_sid = sid[run_start]
+    max_flat = np.zeros(n_series, dtype=np.int64)
+    np.maximum.at(max_flat, run_sid, run_len)
+
+    med = pd.Series(units).groupby(sid).transform("median").to_numpy()
+    dev = np.abs(units - med)
+    mad = pd.Series(dev).groupby(sid).transform("median").to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(mad > 0, 0.6745 * dev / mad, 0.0)
+
+    def total(mask: np.ndarray) -> np.ndarray:
+        return np.bincount(sid, weights=mask, minlength=n_series)
+
+    observed = np.maximum(total(~np.isnan(units)), 1)
+    report = pd.DataFrame({
+        "sku_id": df["sku_id"].to_numpy()[start],
+        "region_id": df["region_id"].to_numpy()[start],
+        "n_obs": counts,
+        "first_date": dates[start],
+        "last_date": dates[end],
+        "duplicates": total(dup).astype(int),
+        "negative_units": total(units < 0).astype(int),
+        "missing_units": total(np.isnan(units)).astype(int),
+        "missing_periods": np.bincount(sid, weights=gap, minlength=n_series).astype(int),
+        "max_gap": pd.Series(gap).groupby(sid).max().to_numpy(),
+        "max_flat_run": max_flat,
+        "zero_share": total(units == 0) / observed,
+        "outliers": total(z > OUTLIER_Z).astype(int),
+    })
+    if "stockout_flag" in df.columns:
+        report["stockout_share"] = total(df["stockout_flag"].to_numpy(dtype=float, na_value=0) > 0) / counts
+    else:
+        report["stockout_share"] = 0.0
+    report["issues"] = _issues(report)
+    return report
+
+
+def _issues(report: pd.DataFrame) -> pd.Series:
+    checks = {
+        "short": report["n_obs"] < MIN_OBS,
+        "duplicates": report["duplicates"] > 0,
+        "negative_units": report["negative_units"] > 0,
+        "gaps": report["missing_periods"] > 0,
+        "flat_run": report["max_flat_run"] >= FLAT_RUN_MIN,
+        "outliers": report["outliers"] > 0,
+        "intermittent": report["zero_share"] >= INTERMITTENT_SHARE,
+        "stockouts": report["stockout_share"] > STOCKOUT_SHARE,
+    }
+    issues = np.full(len(report), "", dtype=object)
+    for label, mask in checks.items():
+        issues = issues + np.where(mask.to_numpy(), label + ";", "")
+    return pd.Series(issues, index=report.index, dtype=object).str.rstrip(";")
+
+
+def save_quality_report(report: pd.DataFrame, path: Union[str, Path, None] = None) -> Path:
+    path = Path(path or QUALITY_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(path, index=False)
+    return path
+
+
+def load_quality_report(path: Union[str, Path, None] = None) -> pd.DataFrame:
+    """Cached report written by `validate_sales`; empty when none exists yet."""
+    path = Path(path or QUALITY_PATH)
+    if not path.exists():
+        return pd.DataFrame(columns=QUALITY_COLUMNS)
+    report = pd.read_csv(path, parse_dates=["first_date","last_date"], keep_default_na=False,
+                         na_values={c: [""] for c in QUALITY_COLUMNS if c != "issues"})
+    return report.astype({"sku_id": str, "region_id": str})
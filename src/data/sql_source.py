@@ -0,0 +1,158 @@
+from __future__ import annotations
+import sqlite3
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from src.data.columns import LAST_COLS, MAX_COLS, MEAN_COLS
+
+SQLITE_MAGIC = b"SQLite format 3\x00"
+DUCKDB_MAGIC = b"DUCK"  # at byte offset 8
+
+
+def sniff_engine(path: Union[str, Path]) -> str:
+    """Return "sqlite" or "duckdb" from the database file header."""
+    with open(path, "rb") as f:
+        head = f.read(16)
+    if head.startswith(SQLITE_MAGIC):
+        return "sqlite"
+    if head[8:12] == DUCKDB_MAGIC:
+        return "duckdb"
+    raise ValueError(f"{path} is neither a SQLite nor a DuckDB database file.")
+
+
+def _connect(path: Path, engine: str):
+    if engine == "duckdb":
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("Reading a DuckDB file requires the 'duckdb' package (pip install duckdb).")
+        return duckdb.connect(str(path), read_only=True)
+    return sqlite3.connect(f"file:{path.resolve()}?mode=ro", uri=True)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _fetch(conn, sql: str, params: List) -> pd.DataFrame:
+    # conn.execute, not a new cursor: DuckDB cursors do not see this connection's temp tables
+    cur = conn.execute(sql, params)
+    if hasattr(cur, "df"):
+        return cur.df()
+    cols = [d[0] for d in cur.description]
+    return pd.DataFrame.from_records(cur.fetchall(), columns=cols)
+
+
+def _select_map(conn, table: str, colmap: Dict[str, str]) -> Dict[str, str]:
+    """Internal name -> quoted source column, matched case-insensitively like `_normalize_schema`."""
+    cur = conn.execute(f"SELECT * FROM {_quote(table)} LIMIT 0")
+    source_cols_lower = {d[0].lower().strip(): d[0] for d in cur.description}
+    mapped = {}
+    for internal, source in colmap.items():
+        if source and source.lower().strip() in source_cols_lower:
+            mapped[internal] = _quote(source_cols_lower[source.lower().strip()])
+    missing = [k for k in ["date","sku_id","units"] if k not in mapped]
+    if missing:
+        raise ValueError(f"Table {table!r} missing required columns ({missing}). Available columns: {list(source_cols_lower.values())}")
+    return mapped
+
+
+def _has_rowid(conn, table: str) -> bool:
+    # Base tables in both engines expose rowid (insertion order); views do not
+    try:
+        conn.execute(f"SELECT rowid FROM {_quote(table)} LIMIT 0")
+        return True
+    except Exception:
+        return False
+
+
+def _week_expr(engine: str, col: str) -> str:
+    # W-SUN week end: the Sunday on or after the date
+    if engine == "duckdb":
+        return f"CAST({col} AS DATE) + CAST((7 - isodow(CAST({col} AS DATE))) % 7 AS INTEGER)"
+    return f"date({col}, 'weekday 0')"
+
+
+def _series_keys(conn, src_sql: str, params: List, series) -> List[Tuple[str, Optional[str]]]:
+    """Resolve a `load_sales` series filter to (sku_id, region_id) keys; region None selects every region."""
+    if isinstance(series, int) or callable(series):
+        sql = f"SELECT DISTINCT sku_id, region_id FROM ({src_sql}) AS s ORDER BY sku_id, region_id"
+        if isinstance(series, int):
+            sql += f" LIMIT {int(series)}"
+        keys = list(_fetch(conn, sql, params).itertuples(index=False, name=None))
+        return [k for k in keys if series(*k)] if callable(series) else keys
+    return [tuple(str(v) for v in x) if isinstance(x, tuple) else (str(x), None) for x in series]
+
+
+def load_weekly_partials(path: Union[str, Path], table: str, colmap: Dict[str, str], series=None,
+                         bounds: Optional[Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]] = None) -> pd.DataFrame:
+    """Run the weekly aggregation inside the database and return mergeable partials.
+
+    The column map becomes the SELECT list, `bounds` (inclusive start,
+    exclusive end on raw dates) and the `series` filter become WHERE
+    clauses, and the GROUP BY produces one row per series-week in the
+    `ingest._partial_week_agg` layout, so only weekly aggregates are
+    fetched.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Database not found: {path}. Update settings.sql_path.")
+    engine = sniff_engine(path)
+    conn = _connect(path, engine)
+    try:
+        cols = _select_map(conn, table, colmap)
+        region = f"CAST({cols['region_id']} AS TEXT)" if "region_id" in cols else "'All'"
+        select = [
+            f"CAST({cols['sku_id']} AS TEXT) AS sku_id",
+            f"{region} AS region_id",
+            f"{cols['date']} AS ts",
+            f"{_week_expr(engine, cols['date'])} AS date",
+            f"{cols['units']} AS units",
+            f"{'rowid' if _has_rowid(conn, table) else '0'} AS row_no",
+        ] + [f"{cols[c]} AS {c}" for c in MEAN_COLS + MAX_COLS + LAST_COLS if c in cols]
+        where = [f"{cols['date']} IS NOT NULL", f"{cols['units']} IS NOT NULL"]
+        params: List = []
+        lo, hi = bounds or (None, None)
+        if lo is not None:
+            where.append(f"{cols['date']} >= ?")
+            params.append(lo.strftime("%Y-%m-%d"))
+        if hi is not None:
+            where.append(f"{cols['date']} < ?")
+            params.append(hi.strftime("%Y-%m-%d"))
+        src_sql = f"SELECT {', '.join(select)} FROM {_quote(table)} WHERE {' AND '.join(where)}"
+        if series is not None:
+            # selected keys go into a temp table, so large filters stay one EXISTS clause
+            conn.execute("CREATE TEMP TABLE load_sales_keys (sku_id TEXT, region_id TEXT)")
+            keys = _series_keys(conn, src_sql, params, series)
+            if keys:
+                conn.executemany("INSERT INTO load_sales_keys VALUES (?, ?)", keys)
+            src_sql = (
+                f"SELECT * FROM ({src_sql}) AS s WHERE EXISTS (SELECT 1 FROM load_sales_keys k "
+                f"WHERE k.sku_id = s.sku_id AND (k.region_id IS NULL OR k.region_id = s.region_id))"
+            )
+        aggs = ["SUM(units) AS units"]
+        for c in MEAN_COLS:
+            if c in cols:
+                aggs += [f"SUM({c}) AS {c}__sum", f"COUNT({c}) AS {c}__cnt"]
+        aggs += [f"MAX({c}) AS {c}" for c in MAX_COLS if c in cols]
+        ctes = [f"src AS ({src_sql})", f"agg AS (SELECT sku_id, region_id, date, {', '.join(aggs)} FROM src GROUP BY sku_id, region_id, date)"]
+        select, joins = ["agg.*"], []
+        for c in LAST_COLS:
+            if c in cols:
+                # value at the latest timestamp of the week, later rows winning ties like the file path
+                ctes.append(
+                    f"last_{c} AS (SELECT sku_id, region_id, date, {c}, ROW_NUMBER() OVER "
+                    f"(PARTITION BY sku_id, region_id, date ORDER BY ts DESC, row_no DESC) AS rn FROM src WHERE {c} IS NOT NULL)"
+                )
+                select.append(f"last_{c}.{c}")
+                joins.append(
+                    f"LEFT JOIN last_{c} ON last_{c}.sku_id = agg.sku_id AND last_{c}.region_id = agg.region_id "
+                    f"AND last_{c}.date = agg.date AND last_{c}.rn = 1"
+                )
+        sql = f"WITH {', '.join(ctes)} SELECT {', '.join(select)} FROM agg {' '.join(joins)}"
+        part = _fetch(conn, sql, params)
+    finally:
+        conn.close()
+    part["date"] = pd.to_datetime(part["date"].astype(str))
+    part["units"] = part["units"].astype(float)
+    return part
@@ -0,0 +1,97 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+DISCOUNT_LEVELS = np.array([0.1, 0.15, 0.2])
+PROMO_LIFT = 2.5  # units multiplier per unit of discount
+
+
+def _names(names: Optional[Sequence[str]], n: int, fmt: str) -> List[str]:
+    if names is None:
+        return [fmt.format(i) for i in range(n)]
+    if len(names) != n:
+        raise ValueError(f"Expected {n} names, got {len(names)}")
+    return list(names)
+
+
+def _block(sku_codes: np.ndarray, n_regions: int, weeks: pd.DatetimeIndex, rng: np.random.Generator,
+           sku_cat: pd.CategoricalDtype, region_cat: pd.CategoricalDtype,
+           seasonality: float, trend: float, noise: float,
+           promo_rate: float, stockout_rate: float, intermittency: float) -> pd.DataFrame:
+    """One block of whole SKUs (all regions), built as [series, weeks] arrays."""
+    n_series, n_weeks = len(sku_codes) * n_regions, len(weeks)
+    shape = (n_series, n_weeks)
+    t = np.arange(n_weeks)
+    base = rng.lognormal(np.log(40), 0.6, n_series)[:, None]
+    level = base * (1 + seasonality * np.sin(2 * np.pi * t / 52) + trend * t + rng.normal(0, noise, shape))
+    promo = rng.random(shape) < promo_rate
+    discount = np.where(promo, DISCOUNT_LEVELS[rng.integers(0, len(DISCOUNT_LEVELS), shape)], 0.0)
+    stockout = rng.random(shape) < stockout_rate
+    no_demand = rng.random(shape) < intermittency
+    units = np.where(stockout | no_demand, 0.0, np.round(np.clip(level, 0, None) * (1 + PROMO_LIFT * discount), 1))
+    price = np.round(rng.uniform(4, 15, len(sku_codes)), 2)
+    return pd.DataFrame({
+        "date": np.tile(weeks.to_numpy(), n_series),
+        "sku_id": pd.Categorical.from_codes(np.repeat(sku_codes, n_regions * n_weeks), dtype=sku_cat),
+        "region_id": pd.Categorical.from_codes(np.tile(np.repeat(np.arange(n_regions), n_weeks), len(sku_codes)), dtype=region_cat),
+        "channel_id": "Retail",
+        "units": units.ravel(),
+        "price": np.repeat(price, n_regions * n_weeks),
+        "discount": discount.ravel(),
+        "promo_flag": promo.ravel().astype(np.int8),
+        "stockout_flag": stockout.ravel().astype(np.int8),
+    })
+
+
+def iter_synthetic(n_skus: int = 3, n_regions: int = 2, n_weeks: int = 140, start: str = "2022-01-02",
+                   seasonality: float = 0.3, trend: float = 0.004, noise: float = 0.12,
+                   promo_rate: float = 0.04, stockout_rate: float = 0.02, intermittency: float = 0.0,
+                   seed: Optional[int] = None, skus_per_chunk: int = 10_000,
+                   sku_names: Optional[Sequence[str]] = None,
+                   region_names: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield synthetic weekly sales in chunks of `skus_per_chunk` SKUs (every region of each).
+
+    `seasonality`, `trend` (per week) and `noise` are relative to each series'
+    base level; `promo_rate`, `stockout_rate` and `intermittency` are
+    per-week probabilities of a promotion, a stockout (zero units, flagged)
+    and a zero-demand week. With a fixed `seed` the output is reproducible
+    for the same `skus_per_chunk`. Identifier columns are categoricals.
+    """
+    weeks = pd.date_range(start, periods=n_weeks, freq="W-SUN")
+    sku_cat = pd.CategoricalDtype(_names(sku_names, n_skus, "SKU_{:06d}"))
+    region_cat = pd.CategoricalDtype(_names(region_names, n_regions, "R{:02d}"))
+    n_chunks = -(-n_skus // skus_per_chunk)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        codes = np.arange(i * skus_per_chunk, min((i + 1) * skus_per_chunk, n_skus))
+        yield _block(codes, n_regions, weeks, np.random.default_rng(child), sku_cat, region_cat,
+                     seasonality, trend, noise, promo_rate, stockout_rate, intermittency)
+
+
+def generate_synthetic(**kwargs) -> pd.DataFrame:
+    """Whole synthetic panel in memory; takes the same arguments as `iter_synthetic`."""
+    return pd.concat(iter_synthetic(**kwargs), ignore_index=True)
+
+
+def write_synthetic_shards(out_dir: Union[str, Path], fmt: str = "csv", **kwargs) -> List[Path]:
+    """Stream `iter_synthetic` chunks to ``part-NNNNN.<fmt>`` files, one chunk in memory at a time.
+
+    CSV shards are long-format files that `load_sales` reads directly with the
+    default column_map.
+    """
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported shard format: {fmt!r} (use 'csv' or 'parquet')")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i, chunk in enumerate(iter_synthetic(**kwargs)):
+        fp = out_dir / f"part-{i:05d}.{fmt}"
+        if fmt == "csv":
+            chunk.to_csv(fp, index=False, date_format="%Y-%m-%d")
+        else:
+            # keep each shard's dictionary to its own SKUs
+            ids = {c: chunk[c].cat.remove_unused_categories() for c in ["sku_id","region_id"]}
+            chunk.assign(**ids).to_parquet(fp, index=False)
+        paths.append(fp)
+    return paths
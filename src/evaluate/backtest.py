@@ -79,7 +79,7 @@ def rolling_backtest_original(
     folds: int = 4,
 ) -> pd.DataFrame:
     results = []
-    for keys, g in frame.groupby(group_cols, sort=False):
+    for keys, g in frame.groupby(group_cols, sort=False, observed=True):
         g = g.sort_values(date_col)
         n = len(g)
         if n <= horizon * (folds + 1):
@@ -110,3 +110,44 @@ def rolling_backtest_original(
                 "mase": mase(y_true, preds, seasonal_period=52),
             })
     return pd.DataFrame(results)
+
+def rolling_backtest_panel(
+    panel,
+    horizon: int,
+    fit_fn: Callable[[pd.Series, pd.DataFrame | None], Any],
+    pred_fn: Callable[[Any, int, pd.DataFrame | None], pd.Series],
+    target_col: str = "units",
+    folds: int = 4,
+) -> pd.DataFrame:
+    """Same folds as `rolling_backtest_original` for target-only models, on a `WeeklyPanel`.
+
+    Each series is taken as a row view instead of a groupby slice; gap weeks
+    (NaN in the dense panel) are dropped first, so folds are over observed
+    rows exactly as in the frame version.
+    """
+    results = []
+    for row, sku, region in panel.iter_rows():
+        # the panel holds NaN for weeks missing inside the span; fold on observed rows like the frame path
+        y_all = panel.series(target_col, row).dropna()
+        n = len(y_all)
+        if n <= horizon * (folds + 1):
+            continue
+        fold_size = max(horizon, (n // (folds + 1)))
+        for f in range(folds):
+            split = n - (folds - f) * fold_size
+            y = y_all.iloc[:split]
+            y_true = y_all.iloc[split:split + horizon].to_numpy(dtype=float)
+            if len(y_true) < horizon:
+                continue
+            model = fit_fn(y.astype(float), None)
+            preds = pred_fn(model, horizon, None)
+            results.append({
+                "sku_id": sku,
+                "region_id": region,
+                "fold": f,
+                "wmape": wmape(y_true, preds),
+                "smape": smape(y_true, preds),
+                "bias": bias(y_true, preds),
+                "mase": mase(y_true, preds, seasonal_period=52),
+            })
+    return pd.DataFrame(results)
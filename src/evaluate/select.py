@@ -2,7 +2,9 @@ from __future__ import annotations
 import pandas as pd
 import joblib
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from src.data.quality import MIN_OBS, INTERMITTENT_SHARE
+from src.features.spec import feature_columns
 from src.models.ets import ETSForecaster
 from src.models.sarimax import SarimaxForecaster
 from src.models.lgbm import LightGBMForecaster
@@ -12,6 +14,8 @@ def select_best_model(metrics_df: pd.DataFrame) -> str:
     """Select best model based on WMAPE from a single SKU's results."""
     if metrics_df.empty:
         return 'ETS'  # Default fallback
+    if metrics_df["wmape"].isna().all():
+        return metrics_df["model"].iloc[0]
     
     # Find the model with lowest WMAPE
     best_idx = metrics_df["wmape"].idxmin()
@@ -61,6 +65,39 @@ def create_model_leaderboard(metrics_df: pd.DataFrame) -> pd.DataFrame:
     
     return leaderboard
 
+MODEL_NAMES = ["ETS", "SARIMAX", "LightGBM"]
+SEASONAL_PERIODS = 52
+
+def route_models(report: pd.DataFrame, models: Optional[List[str]] = None) -> pd.DataFrame:
+    """Candidate models per (sku_id, region_id) from the data-quality report.
+
+    Returns one boolean column per model. Short series get no candidates,
+    mostly-flat series only ETS, and intermittent series or those shorter
+    than two seasonal cycles skip SARIMAX.
+    """
+    models = models or MODEL_NAMES
+    routes = report[["sku_id","region_id"]].astype(str).reset_index(drop=True)
+    n_obs = report["n_obs"].to_numpy()
+    usable = n_obs >= MIN_OBS
+    flat = report["max_flat_run"].to_numpy() * 2 >= n_obs
+    no_sarimax = (report["zero_share"].to_numpy() >= INTERMITTENT_SHARE) | (n_obs < 2 * SEASONAL_PERIODS)
+    for name in models:
+        ok = usable.copy()
+        if name != "ETS":
+            ok &= ~flat
+        if name == "SARIMAX":
+            ok &= ~no_sarimax
+        routes[name] = ok
+    return routes
+
+def routed_frame(frame: pd.DataFrame, routes: pd.DataFrame, model_name: str) -> pd.DataFrame:
+    """Rows of `frame` whose series are routed to `model_name` (all rows when there is no report)."""
+    if routes.empty or model_name not in routes.columns:
+        return frame
+    keys = pd.MultiIndex.from_frame(routes.loc[routes[model_name], ["sku_id","region_id"]])
+    series = pd.MultiIndex.from_arrays([frame["sku_id"].astype(str), frame["region_id"].astype(str)])
+    return frame[series.isin(keys)]
+
 def save_best_models(sales_data: pd.DataFrame, best_models_df: pd.DataFrame, output_dir: Path):
     """Train and save the best model for each SKU."""
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -77,18 +114,16 @@ def save_best_models(sales_data: pd.DataFrame, best_models_df: pd.DataFrame, out
         sku_data = sku_data.sort_values("date")
         y = sku_data["units"]
         
-        # Prepare features
-        exog_cols = [c for c in sku_data.columns if c not in ["date", "units", "sku_id", "region_id"]]
-        X = sku_data[exog_cols] if exog_cols else None
-        
-        # Train the best model
+        # Train the best model on the columns its spec declares (as in the backtest)
         if model_name == "ETS":
             model = ETSForecaster(seasonal="add", seasonal_periods=52).fit(y)
         elif model_name == "SARIMAX":
+            exog_cols = feature_columns("SARIMAX", sku_data)
+            X = sku_data[exog_cols].select_dtypes(include=["number"]).fillna(0.0) if exog_cols else None
             model = SarimaxForecaster().fit(y, X)
         elif model_name == "LightGBM":
-            feat_cols = [c for c in exog_cols if c.startswith(("lag_", "rollmean_", "rollstd_", "promo_flag", "discount", "is_holiday", "month", "weekofyear", "quarter"))]
-            model = LightGBMForecaster(feature_cols=feat_cols).fit(y, X)
+            feat_cols = feature_columns("LightGBM", sku_data)
+            model = LightGBMForecaster(feature_cols=feat_cols).fit(y, sku_data)
         else:
             continue
         
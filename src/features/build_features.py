@@ -1,51 +1,216 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 from pandas.tseries.frequencies import to_offset
-import holidays as pyholidays
+from pandas.tseries.offsets import Day, Tick, Week
+from src.data import polars_backend
+from src.features.calendar import calendar_features
+from src.features.spec import lag_windows, required_features
 from src.utils.config import settings
 
-def add_calendar(df: pd.DataFrame, date_col: str = "date") -> pd.DataFrame:
+def _lean() -> bool:
+    return getattr(settings, "precision", "double") == "lean"
+
+def _float_dtype():
+    return np.float32 if _lean() else np.float64
+
+def add_calendar(df: pd.DataFrame, date_col: str = "date", columns=None) -> pd.DataFrame:
     df = df.copy()
-    df["year"] = df[date_col].dt.year
-    df["weekofyear"] = df[date_col].dt.isocalendar().week.astype(int)
-    df["month"] = df[date_col].dt.month
-    df["quarter"] = df[date_col].dt.quarter
-    country_holidays = pyholidays.country_holidays(settings.country)
-    df["is_holiday"] = df[date_col].dt.date.astype("O").isin(country_holidays).astype(int)
+    lean = _lean()
+    # one lookup into the cached daily calendar table instead of per-row date objects
+    for col, values in calendar_features(df[date_col]).items():
+        if columns is None or col in columns:
+            df[col] = values
+    if lean:
+        lean_types = {"year": np.int16, "weekofyear": np.int8, "month": np.int8, "quarter": np.int8, "is_holiday": np.int8}
+        df = df.astype({c: t for c, t in lean_types.items() if c in df.columns})
     return df
 
+def _series_starts(df: pd.DataFrame, group_cols) -> np.ndarray:
+    """True on the first row of each series in a frame sorted by `group_cols`."""
+    sid = df.groupby(list(group_cols), sort=False, observed=True).ngroup().to_numpy()
+    return np.r_[True, sid[1:] != sid[:-1]] if len(sid) else np.zeros(0, dtype=bool)
+
+def _shifted(a: np.ndarray, k: int, fill) -> np.ndarray:
+    """`a` moved down by `k` rows, the first `k` filled with `fill` (all of it when k >= len(a))."""
+    k = min(k, len(a))
+    out = np.empty_like(a, dtype=np.result_type(a, type(fill)))
+    out[:k] = fill
+    out[k:] = a[:len(a) - k]
+    return out
+
+def _grouped_lag_roll(y: np.ndarray, start: np.ndarray, lags, windows) -> dict:
+    """Per-series lags and rolling mean/std (ddof=1) of the previous values of `y`.
+
+    `y` is in series/date order and `start` marks each series' first row.
+    Window sums come from one set of cumulative sums (of values and
+    non-missing counts) over the sorted panel, centred on each series'
+    mean; the std then sums squared deviations from each window's mean
+    over the `win` offsets, so it keeps the precision of the window's own
+    values even after much larger ones in the same series. A window is NaN
+    unless it holds `win` non-missing values of the same series, like
+    pandas' ``rolling(win)``; runs of identical values give an exact zero std.
+    """
+    n = len(y)
+    idx = np.arange(n)
+    # rows since the series' first row
+    pos = idx - np.maximum.accumulate(np.where(start, idx, 0))
+    sid = np.cumsum(start) - 1
+    out = {}
+    for lag in lags:
+        out[f"lag_{lag}"] = np.where(pos >= lag, _shifted(y, lag, np.nan), np.nan)
+    x = np.where(start, np.nan, _shifted(y, 1, np.nan))
+    valid = ~np.isnan(x)
+    center = np.bincount(sid, weights=np.where(valid, x, 0.0)) / np.maximum(np.bincount(sid, weights=valid), 1)
+    center = center[sid]
+    xc = np.where(valid, x - center, 0.0)
+    # float sums restart at every series so rounding stays at the scale of one series
+    cs = pd.Series(xc).groupby(sid, sort=False).cumsum().to_numpy()
+    cv = np.cumsum(valid)
+    run_start = np.maximum.accumulate(np.where(start | (x != _shifted(x, 1, np.nan)), idx, 0))
+    for win in windows:
+        full = (pos >= win - 1) & (cv - _shifted(cv, win, 0) == win)
+        mean = (cs - _shifted(cs, win, 0.0)) / win
+        ss = np.zeros(n)
+        for j in range(min(win, n)):
+            # rows that are not `full` pick up other series' values here and are masked below
+            ss[j:] += (xc[:n - j] - mean[j:]) ** 2
+        var = ss / (win - 1)
+        var[idx - run_start + 1 >= win] = 0.0
+        out[f"rollmean_{win}"] = np.where(full, mean + center, np.nan)
+        out[f"rollstd_{win}"] = np.where(full, np.sqrt(var), np.nan)
+    return out
+
 def add_lag_roll(df: pd.DataFrame, group_cols=("sku_id","region_id"), y_col="units") -> pd.DataFrame:
     df = df.copy().sort_values(list(group_cols) + ["date"])
-    if getattr(settings, "light_features", False):
-        lag_list = [1,2,4]
-        win_list = [4,8]
+    feat_dtype = _float_dtype()
+    lag_list, win_list = lag_windows()
+    if getattr(settings, "backend", "pandas") == "polars":
+        feats = polars_backend.lag_roll_features(df[y_col], df[list(group_cols)], lag_list, win_list)
     else:
-        lag_list = [1,2,4,8,12]
-        win_list = [4,8,12,26]
+        y = df[y_col].to_numpy(dtype=float, na_value=np.nan)
+        feats = _grouped_lag_roll(y, _series_starts(df, group_cols), lag_list, win_list)
     for lag in lag_list:
-        df[f"lag_{lag}"] = df.groupby(list(group_cols))[y_col].shift(lag)
+        df[f"lag_{lag}"] = np.asarray(feats[f"lag_{lag}"]).astype(feat_dtype)
     for win in win_list:
-        df[f"rollmean_{win}"] = df.groupby(list(group_cols))[y_col].shift(1).rolling(win).mean()
-        df[f"rollstd_{win}"] = df.groupby(list(group_cols))[y_col].shift(1).rolling(win).std()
-    df["zero_flag"] = (df[y_col] == 0).astype(int)
+        df[f"rollmean_{win}"] = np.asarray(feats[f"rollmean_{win}"]).astype(feat_dtype)
+        df[f"rollstd_{win}"] = np.asarray(feats[f"rollstd_{win}"]).astype(feat_dtype)
+    df["zero_flag"] = (df[y_col] == 0).astype(np.int8 if _lean() else int)
     return df
 
-def prepare_features(df: pd.DataFrame) -> pd.DataFrame:
+def _fixed_step(freq):
+    """Constant spacing of `freq` (ticks, days, weeks), or None for calendar offsets like months."""
+    if isinstance(freq, Week):
+        return pd.Timedelta(weeks=freq.n)
+    if isinstance(freq, Day):
+        return pd.Timedelta(days=freq.n)
+    if isinstance(freq, Tick):
+        return pd.Timedelta(freq)
+    return None
+
+def _reindex_series(df: pd.DataFrame, freq) -> pd.DataFrame:
+    """Left-join `df` onto every period from each series' first to last date at `freq`.
+
+    Same rows, columns and order as merging onto concatenated per-series
+    ``pd.date_range(min, max, freq)`` frames (series in first-seen order).
+    For fixed-step frequencies the full index is expanded arithmetically from
+    one groupby of bounds and rows are placed by position, without a merge.
+    """
+    keys = ["sku_id","region_id"]
+    step = _fixed_step(freq)
+    if step is None:
+        all_idx = []
+        for (sku, region), g in df.groupby(keys, sort=False, observed=True):
+            full = pd.DataFrame({"date": pd.date_range(g["date"].min(), g["date"].max(), freq=freq)})
+            full["sku_id"] = sku
+            full["region_id"] = region
+            all_idx.append(full)
+        idx = pd.concat(all_idx, ignore_index=True)
+        for col in keys:
+            # keep categorical identifiers categorical so the merge joins on codes
+            idx[col] = idx[col].astype(df[col].dtype)
+        return idx.merge(df, on=["date"] + keys, how="left")
+    grouped = df.groupby(keys, sort=False, observed=True)
+    bounds = grouped["date"].agg(["min","max"])
+    sid = grouped.ngroup().to_numpy()
+    first = bounds["min"]
+    if isinstance(freq, Week) and freq.weekday is not None:
+        # date_range rolls the start forward onto the anchor weekday
+        first = first + pd.to_timedelta((freq.weekday - first.dt.dayofweek) % 7, unit="D")
+    first = first.to_numpy()
+    step = step.to_timedelta64().astype(first.dtype.str.replace("M8", "m8"))
+    reps = np.maximum((bounds["max"].to_numpy() - first) // step + 1, 0).astype(np.int64)
+    starts = np.cumsum(reps) - reps
+    offsets = np.arange(reps.sum()) - np.repeat(starts, reps)
+    idx = pd.DataFrame({
+        "date": np.repeat(first, reps) + offsets * step,
+        "sku_id": bounds.index.get_level_values("sku_id").repeat(reps).array,
+        "region_id": bounds.index.get_level_values("region_id").repeat(reps).array,
+    })
+    for col in keys:
+        idx[col] = idx[col].astype(df[col].dtype)
+    # position of each input row in idx; rows off the grid or outside it are dropped like in a merge
+    dates = df["date"].to_numpy()
+    ok = ~np.isnat(dates)
+    delta = (dates[ok] - first[sid[ok]]).astype(step.dtype)
+    k = delta // step
+    on_grid = (delta % step == np.timedelta64(0)) & (k >= 0) & (k < reps[sid[ok]])
+    rows = np.flatnonzero(ok)[on_grid]
+    pos = starts[sid[rows]] + k[on_grid]
+    if len(np.unique(pos)) != len(pos):
+        # duplicate (series, date) rows: a merge repeats them
+        return idx.merge(df, on=["date"] + keys, how="left")
+    take = np.full(len(idx), -1, dtype=np.int64)
+    take[pos] = rows
+    for col in df.columns:
+        if col not in idx.columns:
+            idx[col] = pd.api.extensions.take(df[col].array, take, allow_fill=True)
+    return idx
+
+def prepare_features(df: pd.DataFrame, models=None) -> pd.DataFrame:
+    """Features for `models` (names in `spec.MODEL_FEATURES`; every registered model when None)."""
+    if getattr(settings, "feature_store", False):
+        from src.features.store import prepare_features_incremental
+        return prepare_features_incremental(df, models)
+    return compute_features(df, models)
+
+def compute_features(df: pd.DataFrame, models=None) -> pd.DataFrame:
+    """Gap-fill each series, forward-fill exogenous columns, then add calendar and lag/rolling features.
+
+    Only the union of the features `models` declare is computed. Rows
+    without a full lag_1/rollmean_4 history are trimmed either way, so every
+    model set sees the same rows.
+    """
+    need = required_features(models)
     df = df.copy()
     df["date"] = pd.to_datetime(df["date"])
-    freq = to_offset(settings.frequency)
-    all_idx = []
-    for (sku, region), g in df.groupby(["sku_id","region_id"], sort=False):
-        full = pd.DataFrame({"date": pd.date_range(g["date"].min(), g["date"].max(), freq=freq)})
-        full["sku_id"] = sku
-        full["region_id"] = region
-        all_idx.append(full)
-    idx = pd.concat(all_idx, ignore_index=True)
-    df = idx.merge(df, on=["date","sku_id","region_id"], how="left").sort_values(["sku_id","region_id","date"]) 
-    for col in ["price","discount","promo_flag","stockout_flag","channel_id"]:
+    df = _reindex_series(df, to_offset(settings.frequency)).sort_values(["sku_id","region_id","date"]) 
+    for col in need["exog"]:
+        if col in df.columns:
+            df[col] = df.groupby(["sku_id","region_id"], observed=True)[col].ffill()
+            df[col] = df.groupby(["sku_id","region_id"], observed=True)[col].bfill()
+    if _lean():
+        df = _downcast_exog(df)
+    if need["calendar"]:
+        df = add_calendar(df, columns=need["calendar"])
+    if need["lag_roll"]:
+        df = add_lag_roll(df)
+        if not need["zero_flag"]:
+            df = df.drop(columns="zero_flag")
+        return df.dropna(subset=["lag_1","rollmean_4"])
+    if need["zero_flag"]:
+        df["zero_flag"] = (df["units"] == 0).astype(np.int8 if _lean() else int)
+    # warm-up rows: the same ones dropna(lag_1, rollmean_4) removes, from a single lag/window pass
+    y = df["units"].to_numpy(dtype=float, na_value=np.nan)
+    warm = _grouped_lag_roll(y, _series_starts(df, ("sku_id","region_id")), [1], [4])
+    return df[~np.isnan(warm["lag_1"]) & ~np.isnan(warm["rollmean_4"])]
+
+def _downcast_exog(df: pd.DataFrame) -> pd.DataFrame:
+    """Lean mode: float32 prices/discounts and int8 flags (float32 if a flag still has gaps)."""
+    for col in ["price","discount"]:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float32)
+    for col in ["promo_flag","stockout_flag"]:
         if col in df.columns:
-            df[col] = df.groupby(["sku_id","region_id"])[col].ffill().bfill()
-    df = add_calendar(df)
-    df = add_lag_roll(df)
-    df = df.dropna(subset=["lag_1","rollmean_4"]) 
+            df[col] = df[col].astype(np.float32 if df[col].isna().any() else np.int8)
     return df
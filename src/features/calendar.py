@@ -0,0 +1,77 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import holidays as pyholidays
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from src.utils.config import settings
+
+CALENDAR_DIR = Path("data/cache/calendar")
+CALENDAR_COLUMNS = ["year","weekofyear","month","quarter","is_holiday"]
+
+# (country, first_year, last_year) -> daily table, shared by every add_calendar call in the process
+_TABLES: Dict[Tuple[str, int, int], pd.DataFrame] = {}
+
+
+def _build_table(country: str, first_year: int, last_year: int) -> pd.DataFrame:
+    days = pd.date_range(f"{first_year}-01-01", f"{last_year}-12-31", freq="D")
+    country_holidays = pyholidays.country_holidays(country, years=range(first_year, last_year + 1))
+    return pd.DataFrame({
+        "date": days,
+        "year": days.year,
+        "weekofyear": days.isocalendar()["week"].to_numpy().astype(np.int64),
+        "month": days.month,
+        "quarter": days.quarter,
+        "is_holiday": days.isin(pd.DatetimeIndex(list(country_holidays.keys()))).astype(np.int64),
+    })
+
+
+def calendar_table(first_year: int, last_year: int, country: Optional[str] = None) -> pd.DataFrame:
+    """Daily calendar dimension (one row per day of whole years) for `country`.
+
+    Built once per process and, with ``settings.calendar_cache``, persisted
+    as Parquet under data/cache/calendar keyed by country, years and the
+    holidays package version. Caching is skipped silently when Parquet
+    support is unavailable.
+    """
+    country = country or settings.country
+    key = (country, int(first_year), int(last_year))
+    if key in _TABLES:
+        return _TABLES[key]
+    use_cache = getattr(settings, "calendar_cache", False)
+    entry = CALENDAR_DIR / f"calendar-{country}-{key[1]}-{key[2]}-{pyholidays.__version__}.parquet"
+    table = None
+    if use_cache and entry.exists():
+        try:
+            table = pd.read_parquet(entry)
+        except Exception:
+            entry.unlink(missing_ok=True)
+    if table is None:
+        table = _build_table(*key)
+        if use_cache:
+            try:
+                CALENDAR_DIR.mkdir(parents=True, exist_ok=True)
+                tmp = entry.with_suffix(".tmp")
+                table.to_parquet(tmp, index=False)
+                tmp.replace(entry)
+            except Exception:
+                pass
+    _TABLES[key] = table
+    return table
+
+
+def calendar_features(dates: pd.Series, country: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Calendar columns for `dates`, looked up in the dimension table by day offset."""
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    days = dates.to_numpy().astype("datetime64[D]")
+    if np.isnat(days).any():
+        raise ValueError("Calendar features need a date on every row; found missing dates.")
+    years = days.astype("datetime64[Y]").astype(np.int64) + 1970
+    if len(years):
+        first_year, last_year = int(years.min()), int(years.max())
+    else:
+        first_year = last_year = pd.Timestamp.today().year
+    table = calendar_table(first_year, last_year, country)
+    pos = (days - np.datetime64(f"{first_year}-01-01", "D")).astype(np.int64)
+    return {col: table[col].to_numpy()[pos] for col in CALENDAR_COLUMNS}
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+from sklearn.cluster import KMeans
+from src.data.panel import WeeklyPanel
+from src.utils.config import settings
+
+CLUSTER_DIR = Path("data/cache/clusters")
+CLUSTER_VERSION = 1  # bump when series_profiles or the clustering changes
+SEASON_BUCKETS = 13  # four-week buckets of the ISO week of year
+
+
+def series_profiles(panel: WeeklyPanel) -> pd.DataFrame:
+    """Scale, intermittency and seasonal profile of every series, from the dense units array.
+
+    scale is log1p of the mean, zero_share and cv (std / mean) describe
+    intermittency, and season_1..season_13 are the mean units of each
+    four-week bucket of the year relative to the series mean, minus 1.
+    """
+    units = np.asarray(panel.arrays["units"], dtype=np.float64)
+    observed = ~np.isnan(units)
+    n_obs = np.maximum(observed.sum(axis=1), 1)
+    mean = np.where(observed, units, 0.0).sum(axis=1) / n_obs
+    var = np.where(observed, (units - mean[:, None]) ** 2, 0.0).sum(axis=1) / n_obs
+    safe = np.where(mean > 0, mean, 1.0)
+    out = panel.index[["sku_id","region_id"]].copy()
+    out["scale"] = np.log1p(np.maximum(mean, 0.0))
+    out["zero_share"] = (units == 0).sum(axis=1) / n_obs
+    out["cv"] = np.where(mean > 0, np.sqrt(var) / safe, 0.0)
+    bucket = (np.minimum(panel.weeks.isocalendar()["week"].to_numpy(), 52) - 1) // 4
+    rel = units / safe[:, None]
+    for b in range(SEASON_BUCKETS):
+        cols = bucket == b
+        hits = observed[:, cols].sum(axis=1)
+        level = np.where(observed[:, cols], rel[:, cols], 0.0).sum(axis=1) / np.maximum(hits, 1)
+        out[f"season_{b + 1}"] = np.where(hits > 0, level - 1.0, 0.0)
+    return out
+
+
+def _cache_key(panel: WeeklyPanel, n_clusters: int) -> str:
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(panel.arrays["units"], dtype=np.float64).tobytes())
+    h.update("|".join(f"{s}/{r}" for s, r in zip(panel.index["sku_id"].astype(str), panel.index["region_id"].astype(str))).encode("utf-8"))
+    h.update(f"{panel.weeks[0]:%Y-%m-%d}|{n_clusters}|{CLUSTER_VERSION}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def cluster_series(panel: WeeklyPanel, n_clusters: Optional[int] = None) -> pd.DataFrame:
+    """Cluster id per (sku_id, region_id) from k-means on `series_profiles`.
+
+    Scale, intermittency (zero_share, cv) and the seasonal profile weigh
+    equally after standardizing. With ``settings.cluster_cache`` the result
+    is stored as Parquet under data/cache/clusters, keyed by a digest of the
+    units array, and reused while the data and `n_clusters` are unchanged.
+    """
+    n_clusters = n_clusters or settings.n_clusters
+    use_cache = settings.cluster_cache
+    entry = CLUSTER_DIR / f"clusters-{_cache_key(panel, n_clusters)}.parquet"
+    keys = panel.index[["sku_id","region_id"]]
+    if use_cache and entry.exists():
+        try:
+            return pd.read_parquet(entry).astype({c: keys[c].dtype for c in keys.columns})
+        except Exception:
+            entry.unlink(missing_ok=True)
+    profiles = series_profiles(panel)
+    groups = [["scale"], ["zero_share","cv"], [f"season_{b + 1}" for b in range(SEASON_BUCKETS)]]
+    parts = []
+    for cols in groups:
+        x = profiles[cols].to_numpy()
+        std = x.std(axis=0)
+        parts.append((x - x.mean(axis=0)) / np.where(std > 0, std, 1.0) / np.sqrt(len(cols)))
+    k = max(min(n_clusters, len(profiles)), 1)
+    out = keys.copy()
+    out["cluster"] = KMeans(n_clusters=k, n_init=4, random_state=42).fit_predict(np.hstack(parts)).astype(np.int64)
+    if use_cache:
+        try:
+            CLUSTER_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = entry.with_suffix(".tmp")
+            out.astype({"sku_id": str, "region_id": str}).to_parquet(tmp, index=False)
+            tmp.replace(entry)
+        except Exception:
+            pass
+    return out
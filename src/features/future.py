@@ -0,0 +1,61 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence
+from pandas.tseries.frequencies import to_offset
+from src.features.build_features import add_calendar
+from src.features.calendar import CALENDAR_COLUMNS
+from src.utils.config import settings
+
+SERIES_KEYS = ["sku_id","region_id"]
+# Exogenous columns that are zero in future periods unless the promo plan sets them
+PLANNED_COLUMNS = {"promo_flag": 0, "discount": 0.0}
+
+
+def build_future_exog(feats: pd.DataFrame, horizon: int, columns: Optional[Sequence[str]] = None,
+                      promo_plan: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Exogenous rows for the `horizon` periods after each series' last date in `feats`.
+
+    Returns sku_id, region_id, date and `columns` (default: every feature
+    column of `feats`), series in first-seen order and `horizon` consecutive
+    rows per series, so each series' block lines up with
+    ``predict(horizon, X_future)``. Calendar columns come from the cached
+    calendar table, promo_flag and discount from `promo_plan` (rows keyed by
+    sku_id, optional region_id, and date; unplanned periods are 0), and
+    every other column carries the series' last value.
+    """
+    if columns is None:
+        columns = [c for c in feats.columns if c not in SERIES_KEYS + ["date","units"]]
+    columns = [c for c in columns if c not in SERIES_KEYS + ["date"]]
+    # last row of each series, series numbered in first-seen order
+    sid = feats.groupby(SERIES_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    order = np.lexsort((feats["date"].to_numpy(), sid))
+    ends = np.r_[np.flatnonzero(np.diff(sid[order])), len(order) - 1]
+    last = feats.iloc[order[ends]]
+    n_series = len(last)
+    offset = to_offset(settings.frequency)
+    # step-major date grid, one vectorized offset per step, then flattened series-major
+    last_dates = pd.DatetimeIndex(last["date"])
+    grid = np.stack([(last_dates + step * offset).to_numpy() for step in range(1, horizon + 1)], axis=1)
+    rows = np.repeat(np.arange(n_series), horizon)
+    carry = [c for c in columns if c not in CALENDAR_COLUMNS and c in last.columns]
+    future = last[SERIES_KEYS + carry].iloc[rows].reset_index(drop=True)
+    future.insert(2, "date", grid.ravel())
+    calendar = [c for c in columns if c in CALENDAR_COLUMNS]
+    if calendar:
+        future = add_calendar(future, columns=calendar)
+    for col, default in PLANNED_COLUMNS.items():
+        if col in columns:
+            future[col] = _planned(future, promo_plan, col, default).astype(feats[col].dtype if col in feats.columns else type(default))
+    return future[SERIES_KEYS + ["date"] + columns]
+
+
+def _planned(future: pd.DataFrame, plan: Optional[pd.DataFrame], col: str, default) -> np.ndarray:
+    if plan is None or col not in plan.columns:
+        return np.full(len(future), default)
+    keys = [k for k in SERIES_KEYS if k in plan.columns] + ["date"]
+    left = future[keys].astype({k: str for k in keys if k != "date"})
+    right = plan[keys + [col]].astype({k: str for k in keys if k != "date"})
+    right["date"] = pd.to_datetime(right["date"]).astype(left["date"].dtype)
+    values = left.merge(right.drop_duplicates(keys, keep="last"), on=keys, how="left")[col]
+    return values.fillna(default).to_numpy()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Sequence
+from src.features.calendar import CALENDAR_COLUMNS
+from src.utils.config import settings
+
+EXOG_COLUMNS = ["price","discount","promo_flag","stockout_flag","channel_id"]
+
+# (lags, rolling windows) in periods of settings.frequency, picked by settings.light_features
+LAG_WINDOWS = {
+    "light": ([1,2,4], [4,8]),
+    "full": ([1,2,4,8,12], [4,8,12,26]),
+}
+
+# Features each model reads: calendar and exogenous columns by name, whether
+# it uses the lag/rolling block (lag_*, rollmean_*, rollstd_*) and zero_flag.
+MODEL_FEATURES: Dict[str, Dict] = {
+    "ETS": {"calendar": [], "exog": [], "lag_roll": False, "zero_flag": False},
+    "SARIMAX": {"calendar": list(CALENDAR_COLUMNS), "exog": list(EXOG_COLUMNS), "lag_roll": True, "zero_flag": True},
+    "LightGBM": {"calendar": ["is_holiday","month","weekofyear","quarter"], "exog": ["promo_flag","discount"],
+                 "lag_roll": True, "zero_flag": False},
+}
+
+
+def lag_windows():
+    """(lags, rolling windows) in use, in periods of ``settings.frequency``."""
+    return LAG_WINDOWS["light" if getattr(settings, "light_features", False) else "full"]
+
+
+def register_model_features(name: str, calendar: Sequence[str] = (), exog: Sequence[str] = (),
+                            lag_roll: bool = False, zero_flag: bool = False) -> None:
+    """Declare (or replace) the features a model reads."""
+    unknown = [c for c in calendar if c not in CALENDAR_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown calendar features {unknown}; expected a subset of {CALENDAR_COLUMNS}")
+    MODEL_FEATURES[name] = {"calendar": list(calendar), "exog": list(exog), "lag_roll": bool(lag_roll), "zero_flag": bool(zero_flag)}
+
+
+def _spec(name: str) -> Dict:
+    if name not in MODEL_FEATURES:
+        raise ValueError(f"No feature spec registered for model {name!r}; known: {list(MODEL_FEATURES)}")
+    return MODEL_FEATURES[name]
+
+
+def required_features(models: Optional[Iterable[str]] = None) -> Dict:
+    """Union of the feature specs of `models` (every registered model when None)."""
+    specs = [_spec(m) for m in (MODEL_FEATURES if models is None else models)]
+    return {
+        "calendar": [c for c in CALENDAR_COLUMNS if any(c in s["calendar"] for s in specs)],
+        "exog": [c for c in EXOG_COLUMNS if any(c in s["exog"] for s in specs)],
+        "lag_roll": any(s["lag_roll"] for s in specs),
+        "zero_flag": any(s["zero_flag"] for s in specs),
+    }
+
+
+def feature_columns(model: str, frame: pd.DataFrame) -> List[str]:
+    """Numeric columns of `frame` that `model` reads, in frame order."""
+    spec = _spec(model)
+    names = set(spec["calendar"]) | set(spec["exog"]) | ({"zero_flag"} if spec["zero_flag"] else set())
+    lag_roll = ("lag_", "rollmean_", "rollstd_") if spec["lag_roll"] else ()
+    numeric = frame.select_dtypes(include=["number"]).columns
+    return [c for c in numeric if c in names or (lag_roll and c.startswith(lag_roll))]
@@ -0,0 +1,231 @@
+from __future__ import annotations
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Tuple
+from pandas.tseries.frequencies import to_offset
+from src.features.build_features import _downcast_exog, _lean, compute_features
+from src.features.spec import lag_windows, required_features
+from src.utils.config import settings
+
+FEATURE_STORE_DIR = Path("data/cache/feature_store")
+STORE_VERSION = 3   # bump when compute_features changes its output for the same spec
+MAX_SEGMENTS = 16   # segments kept before the store is compacted into one
+SERIES_KEYS = ["sku_id","region_id"]
+
+
+def feature_spec(models=None) -> Dict:
+    """Everything besides the input rows that changes `compute_features(df, models)` output."""
+    lags, windows = lag_windows()
+    return {
+        "features": required_features(models),
+        "lags": lags,
+        "windows": windows,
+        "frequency": settings.frequency,
+        "country": settings.country,
+        "precision": getattr(settings, "precision", "double"),
+        "version": STORE_VERSION,
+    }
+
+
+def _store_dir(spec: Dict) -> Path:
+    key = hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return FEATURE_STORE_DIR / key
+
+
+def reset_feature_store() -> None:
+    """Drop every persisted feature set."""
+    if FEATURE_STORE_DIR.exists():
+        for fp in FEATURE_STORE_DIR.glob("*/*"):
+            fp.unlink(missing_ok=True)
+
+
+def _series_of_rows(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row series number (first-seen order) and the first row of each series."""
+    sid = frame.groupby(SERIES_KEYS, sort=False, observed=True).ngroup().to_numpy()
+    first = np.empty(int(sid.max()) + 1 if len(sid) else 0, dtype=np.int64)
+    first[sid[::-1]] = np.arange(len(sid))[::-1]
+    return sid, first
+
+
+def _key_index(frame: pd.DataFrame, rows: np.ndarray) -> pd.MultiIndex:
+    # keys as strings, so categorical and string identifiers from different runs compare equal
+    return pd.MultiIndex.from_frame(frame[SERIES_KEYS].iloc[rows].astype(str))
+
+
+def _lookup(frame: pd.DataFrame, index: pd.MultiIndex) -> np.ndarray:
+    """Position of each row's series in `index`, -1 when absent."""
+    sid, first = _series_of_rows(frame)
+    return index.get_indexer(_key_index(frame, first))[sid]
+
+
+def _grouped_max(values: np.ndarray, sid: np.ndarray, n: int) -> np.ndarray:
+    """Per-series max of int64 `values`, the int64 minimum (NaT) for series without rows."""
+    out = np.full(n, np.iinfo(np.int64).min)
+    np.maximum.at(out, sid, values)
+    return out
+
+
+def _empty_state(cols) -> pd.DataFrame:
+    state = pd.DataFrame({
+        "sku_id": pd.Series([], dtype=str), "region_id": pd.Series([], dtype=str),
+        "watermark": pd.to_datetime([]), "n_rows": np.array([], dtype=np.int64),
+        "base": np.array([], dtype=np.int64),
+    })
+    for col in cols:
+        state[f"wm_{col}"] = pd.Series([], dtype=str)
+        state[f"known_{col}"] = pd.to_datetime([])
+    return state
+
+
+def prepare_features_incremental(df: pd.DataFrame, models=None) -> pd.DataFrame:
+    """`compute_features(df, models)` through a persisted store under data/cache/feature_store.
+
+    The store is keyed by `feature_spec` and keeps the feature rows as
+    Parquet segments tagged with a stable series number, plus per series
+    the last input date (watermark), the input row count up to it, the
+    watermark row's values and the last known date of each exogenous
+    column. Input is treated as append-only per series except for the
+    watermark row, which a re-aggregated boundary week may restate: a
+    series whose count up to the watermark is unchanged recomputes only
+    its tail, from the watermark row on, when that row changed or newer
+    rows arrived. The tail reads max(lags, windows) periods of context,
+    extended back to the last known value of each forward-filled
+    exogenous column. New and restated series are recomputed in full.
+    Other in-place edits of old rows are not detected; call
+    `reset_feature_store` after them. Stored rows are assembled by series
+    number and date without regrouping them. Rows come back sorted by
+    series and date with a fresh RangeIndex.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("settings.feature_store stores features as Parquet and requires 'pyarrow'.")
+    spec = feature_spec(models)
+    exog = [c for c in spec["features"]["exog"] if c in df.columns]
+    compared = ["units"] + exog
+    store = _store_dir(spec)
+    manifest_fp, state_fp = store / "manifest.json", store / "series.parquet"
+    manifest = json.loads(manifest_fp.read_text()) if manifest_fp.exists() else None
+    state = pd.read_parquet(state_fp) if manifest is not None and state_fp.exists() else None
+    if manifest is None or manifest.get("spec") != spec or state is None or list(state.columns) != list(_empty_state(compared).columns):
+        manifest = {"spec": spec, "segments": 0}
+        state = _empty_state(compared)
+    state = state.astype({c: str for c in SERIES_KEYS})
+
+    dates = pd.to_datetime(df["date"]).to_numpy()
+    stamps = dates.view(np.int64)
+    sid, first = _series_of_rows(df)
+    n_series = len(first)
+    series = _key_index(df, first)
+    pos = pd.MultiIndex.from_frame(state[SERIES_KEYS]).get_indexer(series)
+    known = pos >= 0
+    stored = state.iloc[np.where(known, pos, 0)] if len(state) else _empty_state(compared).reindex(range(n_series))
+    watermark = np.where(known, stored["watermark"].to_numpy().astype(dates.dtype), np.datetime64("NaT"))
+    old_rows = dates <= watermark[sid]
+    at_mark = np.flatnonzero(dates == watermark[sid])
+    # same history: as many rows up to the watermark as when it was stored, the watermark row included
+    same = known & (stored["n_rows"].to_numpy() == np.bincount(sid, weights=old_rows, minlength=n_series))
+    same &= np.bincount(sid[at_mark], minlength=n_series) == 1
+    changed = np.zeros(n_series, dtype=bool)
+    for col in compared:
+        # a re-aggregated boundary week restates the watermark row
+        differs = df[col].iloc[at_mark].astype(str).to_numpy() != stored[f"wm_{col}"].to_numpy()[sid[at_mark]]
+        changed[sid[at_mark][differs]] = True
+    context = max(spec["lags"] + spec["windows"]) + 1
+    lo = (pd.Series(watermark) - context * to_offset(settings.frequency)).to_numpy()
+    for col in exog:
+        last_known = stored[f"known_{col}"].to_numpy().astype(dates.dtype)
+        # the per-series forward-fill reaches back to the column's last known value
+        lo = np.where(np.isnat(last_known), lo, np.minimum(lo, last_known))
+        # with no value up to the watermark, the back-fill of a later one rewrites old rows
+        later = np.bincount(sid, weights=~old_rows & df[col].notna().to_numpy(), minlength=n_series) > 0
+        same &= ~(np.isnat(last_known) & later)
+    tail = same & (changed | (np.bincount(sid, weights=~old_rows, minlength=n_series) > 0))
+
+    # stable series numbers: known series keep theirs, new ones are appended
+    number = np.where(known, pos, 0)
+    fresh = np.flatnonzero(~known)
+    number[fresh] = len(state) + np.arange(len(fresh))
+    segment = manifest["segments"]
+    parts = []
+    if tail.any():
+        part = compute_features(df[tail[sid] & (dates >= lo[sid])], models)
+        own = _lookup(part, series)
+        keep = part["date"].to_numpy() >= watermark[own]
+        parts.append(part[keep].assign(series=number[own[keep]]))
+    if not same.all():
+        part = compute_features(df[~same[sid]], models)
+        parts.append(part.assign(series=number[_lookup(part, series)]))
+
+    now = pd.concat([state, series.to_frame(index=False).iloc[fresh]], ignore_index=True)
+    touched = number[~same | tail]
+    marks = _grouped_max(stamps, sid, n_series)
+    now.loc[touched, "watermark"] = marks.view(dates.dtype)[~same | tail]
+    now.loc[touched, "n_rows"] = np.bincount(sid, minlength=n_series)[~same | tail]
+    now.loc[number[~same], "base"] = segment
+    last = np.flatnonzero(stamps == marks[sid])
+    for col in compared:
+        values = np.empty(n_series, dtype=object)
+        values[sid[last]] = df[col].iloc[last].astype(str).to_numpy()
+        now.loc[touched, f"wm_{col}"] = values[~same | tail]
+    for col in exog:
+        seen = _grouped_max(np.where(df[col].notna().to_numpy(), stamps, np.iinfo(np.int64).min), sid, n_series).view(dates.dtype)
+        now.loc[touched, f"known_{col}"] = seen[~same | tail]
+    now = now.astype({"n_rows": np.int64, "base": np.int64})
+
+    store.mkdir(parents=True, exist_ok=True)
+    if parts:
+        written = pd.concat(parts, ignore_index=True, sort=False)
+        manifest.setdefault("columns", [c for c in written.columns if c != "series"])
+        written.drop(columns=SERIES_KEYS).to_parquet(store / f"segment-{segment:06d}.parquet", index=False)
+        manifest["segments"] = segment + 1
+    out = _assemble(store, now, number, df, first, manifest["columns"])
+    if manifest["segments"] > MAX_SEGMENTS:
+        for fp in store.glob("segment-*.parquet"):
+            fp.unlink()
+        # renumbered to this input's series; the rest of the state goes with the old segments
+        out.drop(columns=SERIES_KEYS).assign(series=_lookup(out, series)).to_parquet(store / "segment-000000.parquet", index=False)
+        now = now.iloc[number].reset_index(drop=True).assign(base=0)
+        manifest["segments"] = 1
+    now.to_parquet(state_fp, index=False)
+    manifest_fp.write_text(json.dumps(manifest))
+    if _lean():
+        out = _downcast_exog(out)
+    return out
+
+
+def _assemble(store: Path, state: pd.DataFrame, number: np.ndarray, df: pd.DataFrame, first: np.ndarray, columns) -> pd.DataFrame:
+    """Stored rows of the series of `df`, sorted by series and date, later segments winning on a date."""
+    # a series' rows are valid from the segment that last recomputed it in full
+    df_of = np.full(len(state), -1)
+    df_of[number] = np.arange(len(number))
+    base = state["base"].to_numpy()
+    parts, segs = [], []
+    for fp in sorted(store.glob("segment-*.parquet")):
+        part = pd.read_parquet(fp)
+        seg = int(fp.stem.split("-")[1])
+        no = part["series"].to_numpy()
+        keep = (df_of[no] >= 0) & (base[no] <= seg)
+        parts.append(part[keep])
+        segs.append(np.full(int(keep.sum()), seg))
+    rows = pd.concat(parts, ignore_index=True, sort=False)
+    keys = df[SERIES_KEYS].iloc[first].reset_index(drop=True)
+    rank = np.empty(len(keys), dtype=np.int64)
+    rank[keys.sort_values(SERIES_KEYS).index.to_numpy()] = np.arange(len(keys))
+    own = df_of[rows["series"].to_numpy()]
+    key_rank, when, seg = rank[own], rows["date"].to_numpy(), np.concatenate(segs)
+    order = np.lexsort((seg, when, key_rank))
+    key_rank, when = key_rank[order], when[order]
+    # a tail recompute restates its series' old watermark row: keep the latest segment's copy
+    last = np.r_[(key_rank[1:] != key_rank[:-1]) | (when[1:] != when[:-1]), True]
+    order = order[last]
+    out = rows.drop(columns="series").take(order).reset_index(drop=True)
+    ids = keys.take(own[order]).reset_index(drop=True)
+    for col in SERIES_KEYS:
+        out[col] = ids[col]
+    if "channel_id" in df.columns:
+        out["channel_id"] = out["channel_id"].astype(df["channel_id"].dtype)
+    return out[list(columns)]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from typing import Optional
+from src.data.panel import WeeklyPanel
+from src.features.future import build_future_exog
+from src.features.spec import feature_columns
+from src.models.ets import ETSForecaster
+from src.models.lgbm import GlobalLightGBMForecaster
+from src.utils.config import settings
+
+SERIES_KEYS = ["sku_id","region_id"]
+
+
+def _cluster_of_rows(frame: pd.DataFrame, clusters: pd.DataFrame) -> np.ndarray:
+    """Cluster id of each row of `frame`, -1 for series without one."""
+    index = pd.MultiIndex.from_frame(clusters[SERIES_KEYS].astype(str))
+    pos = index.get_indexer(pd.MultiIndex.from_arrays([frame[c].astype(str) for c in SERIES_KEYS]))
+    return np.where(pos >= 0, clusters["cluster"].to_numpy()[pos], -1)
+
+
+def forecast_lgbm_clusters(feats: pd.DataFrame, clusters: pd.DataFrame, horizon: Optional[int] = None) -> pd.DataFrame:
+    """One GlobalLightGBMForecaster per cluster, trained on the stacked rows of its series."""
+    horizon = horizon or settings.horizon
+    cols = feature_columns("LightGBM", feats)
+    future = build_future_exog(feats, horizon, cols)
+    row_cluster, future_cluster = _cluster_of_rows(feats, clusters), _cluster_of_rows(future, clusters)
+    out = []
+    for c in np.unique(row_cluster[row_cluster >= 0]):
+        train = feats[row_cluster == c]
+        model = GlobalLightGBMForecaster(feature_cols=cols).fit(train["units"], train)
+        out.append(model.predict_recursive(train, future[future_cluster == c]).assign(cluster=c))
+    return pd.concat(out, ignore_index=True)
+
+
+def forecast_ets_clusters(panel: WeeklyPanel, clusters: pd.DataFrame, horizon: Optional[int] = None) -> pd.DataFrame:
+    """One ETS per cluster on the mean of its series' units relative to their own mean.
+
+    The cluster curve keeps the panel's week grid from its first to its last
+    observed week (empty weeks carry the previous value) and is forecast from
+    its end. Each series' forecast covers the `horizon` weeks after its own
+    last observed week, read off the curve (observed part, then forecast)
+    at those weeks and scaled by the series mean.
+    """
+    horizon = horizon or settings.horizon
+    units = np.asarray(panel.arrays["units"], dtype=np.float64)
+    observed = ~np.isnan(units)
+    mean = np.where(observed, units, 0.0).sum(axis=1) / np.maximum(observed.sum(axis=1), 1)
+    rel = units / np.where(mean > 0, mean, 1.0)[:, None]
+    cluster = _cluster_of_rows(panel.index, clusters)
+    last_col = panel.index["last"].to_numpy()
+    paths = np.full((len(units), horizon), np.nan)
+    for c in np.unique(cluster[cluster >= 0]):
+        rows = cluster == c
+        hits = observed[rows].sum(axis=0)
+        start, end = np.flatnonzero(hits)[[0, -1]]
+        curve = pd.Series(np.where(observed[rows], rel[rows], 0.0).sum(axis=0) / np.where(hits > 0, hits, np.nan))
+        curve = curve.iloc[start:end + 1].ffill().reset_index(drop=True)
+        path = np.r_[curve.to_numpy(), ETSForecaster().fit(curve).predict(horizon).to_numpy()]
+        # week last + k of a series sits at curve position last + k - start
+        paths[rows] = path[(last_col[rows] - start)[:, None] + np.arange(1, horizon + 1)] * mean[rows, None]
+    n_series = len(units)
+    last = panel.weeks[last_col].to_numpy()
+    step = np.tile(np.arange(1, horizon + 1), n_series)
+    out = pd.DataFrame({
+        "sku_id": panel.index["sku_id"].to_numpy().repeat(horizon),
+        "region_id": panel.index["region_id"].to_numpy().repeat(horizon),
+        "date": np.repeat(last, horizon) + step * np.timedelta64(7, "D"),
+        "forecast": paths.ravel(),
+        "cluster": cluster.repeat(horizon),
+    })
+    return out[out["cluster"] >= 0].reset_index(drop=True)
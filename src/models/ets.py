@@ -11,7 +11,8 @@ class ETSForecaster:
         self.result = None
 
     def fit(self, y: pd.Series, X=None):
-        y_clean = y.astype(float)
+        # statsmodels only forecasts from a date or 0-based range index; slices of a feature frame have neither
+        y_clean = y.astype(float).reset_index(drop=True)
         use_seasonal = self.seasonal
         if len(y_clean) < 2 * self.seasonal_periods:
             use_seasonal = None
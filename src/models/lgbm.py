@@ -1,7 +1,13 @@
 from __future__ import annotations
+import os
+import numpy as np
 import pandas as pd
 from lightgbm import LGBMRegressor
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from src.utils.config import settings
+
+SERIES_KEYS = ["sku_id","region_id"]
 
 class LightGBMForecaster:
     def __init__(self, feature_cols: List[str]):
@@ -10,11 +16,224 @@ class LightGBMForecaster:
             n_estimators=400, learning_rate=0.05, max_depth=-1, subsample=0.9, colsample_bytree=0.9, random_state=42
         )
 
-    def fit(self, y: pd.Series, X: Optional[pd.DataFrame] = None):
+    def _features(self, X: pd.DataFrame) -> pd.DataFrame:
         X_local = X[self.feature_cols]
+        if getattr(settings, "precision", "double") == "lean":
+            # LightGBM keeps float32 input as float32 only if no column is wider
+            wide = [c for c in X_local.columns if X_local[c].dtype == np.float64]
+            if wide:
+                X_local = X_local.astype({c: np.float32 for c in wide})
+        return X_local
+
+    def fit(self, y: pd.Series, X: Optional[pd.DataFrame] = None):
+        X_local = self._features(X)
         self.model.fit(X_local, y)
         return self
 
     def predict(self, horizon: int, X_future: Optional[pd.DataFrame] = None) -> pd.Series:
-        preds = self.model.predict(X_future[self.feature_cols])
+        preds = self.model.predict(self._features(X_future))
         return pd.Series(preds, index=X_future.index)
+
+    def _lag_windows(self):
+        lags = [int(c[4:]) for c in self.feature_cols if c.startswith("lag_")]
+        windows = sorted({int(c.split("_")[1]) for c in self.feature_cols if c.startswith(("rollmean_","rollstd_"))})
+        return lags, windows, max(lags + windows, default=1)
+
+    @staticmethod
+    def _future_series(future: pd.DataFrame):
+        """Series number of each future row and a (series, step) -> row position table.
+
+        Rows may come in any order; each series' steps are ordered by date.
+        """
+        sid = future.groupby(SERIES_KEYS, sort=False, observed=True).ngroup().to_numpy()
+        n_series = int(sid.max()) + 1 if len(sid) else 0
+        horizon = len(future) // max(n_series, 1)
+        if n_series and (np.bincount(sid) != horizon).any():
+            raise ValueError("Forecasting needs the same number of future rows for every series.")
+        order = np.lexsort((future["date"].to_numpy(), sid)).reshape(n_series, horizon)
+        return sid, order
+
+    @staticmethod
+    def _ring_buffer(history: pd.DataFrame, future: pd.DataFrame, order: np.ndarray, size: int, y_col: str) -> np.ndarray:
+        """Last `size` values of `y_col` per future series; buf[:, (head - k) % size] is k periods back, head=0."""
+        buf = np.full((order.shape[0], size), np.nan)
+        tail = history.sort_values(SERIES_KEYS + ["date"])
+        back = tail.groupby(SERIES_KEYS, sort=False, observed=True).cumcount(ascending=False).to_numpy()
+        keep = back < size
+        tail, back = tail[keep], back[keep]
+        series = pd.MultiIndex.from_frame(future[SERIES_KEYS].iloc[order[:, 0]])
+        pos = series.get_indexer(pd.MultiIndex.from_frame(tail[SERIES_KEYS]))
+        found = pos >= 0
+        buf[pos[found], size - 1 - back[found]] = tail[y_col].to_numpy(dtype=float, na_value=np.nan)[found]
+        return buf
+
+    def _fill_lag_roll(self, X: pd.DataFrame, buf: np.ndarray, head: int) -> pd.DataFrame:
+        lags, windows, size = self._lag_windows()
+        X = X.copy()
+        for lag in lags:
+            X[f"lag_{lag}"] = buf[:, (head - lag) % size]
+        for win in windows:
+            values = buf[:, (head - 1 - np.arange(win)) % size]
+            if f"rollmean_{win}" in self.feature_cols:
+                X[f"rollmean_{win}"] = values.mean(axis=1)
+            if f"rollstd_{win}" in self.feature_cols:
+                X[f"rollstd_{win}"] = values.std(axis=1, ddof=1)
+        return X
+
+    @staticmethod
+    def _forecast_frame(future: pd.DataFrame, order: np.ndarray, preds: np.ndarray) -> pd.DataFrame:
+        out = future[SERIES_KEYS + ["date"]].copy()
+        forecast = np.empty(len(future))
+        forecast[order.ravel()] = preds.ravel()
+        out["forecast"] = forecast
+        return out
+
+    def predict_recursive(self, history: pd.DataFrame, future: pd.DataFrame, y_col: str = "units") -> pd.DataFrame:
+        """Recursive multi-step forecast for every series in `future` at once.
+
+        `future` holds the exogenous rows of each series' horizon, the same
+        number of rows per series in any order (as from
+        ``build_future_exog``); `history` holds past `y_col` values by sku_id,
+        region_id and date. The last max(lag, window) values of each series
+        sit in a ring buffer; each step fills the lag_*/rollmean_*/rollstd_*
+        columns from it for all series, predicts them in one call and writes
+        the predictions back, so a horizon of h costs h batched predict calls.
+        Returns sku_id, region_id, date and forecast in the row order of `future`.
+        """
+        _, order = self._future_series(future)
+        size = self._lag_windows()[2]
+        buf = self._ring_buffer(history, future, order, size, y_col)
+        preds = np.empty(order.shape)
+        head = 0
+        for step in range(order.shape[1]):
+            X_step = self._fill_lag_roll(future.iloc[order[:, step]], buf, head)
+            preds[:, step] = self.model.predict(self._features(X_step))
+            buf[:, head] = preds[:, step]
+            head = (head + 1) % size
+        return self._forecast_frame(future, order, preds)
+
+    def _booster_params(self) -> dict:
+        p = self.model.get_params()
+        return {
+            "objective": "regression", "learning_rate": p["learning_rate"], "num_leaves": p["num_leaves"],
+            "max_depth": p["max_depth"], "min_child_samples": p["min_child_samples"],
+            "bagging_fraction": p["subsample"], "bagging_freq": p["subsample_freq"],
+            "feature_fraction": p["colsample_bytree"], "seed": p["random_state"], "verbose": -1,
+        }
+
+    def fit_direct(self, frame: pd.DataFrame, horizon: Optional[int] = None, y_col: str = "units"):
+        """Direct multi-horizon training: one booster per step h = 1..horizon.
+
+        Booster h learns `y_col` h - 1 periods after each row of `frame`
+        (booster 1 is the usual one-step model) from that row's lag_* and
+        roll* columns and the other features (calendar, promo, price, ...)
+        of the target period. Bin mappers come from one ``lightgbm.Dataset``
+        of the whole feature matrix; each horizon's matrix (rows whose
+        target exists) is binned against it as a reference. Horizons train
+        in parallel threads splitting ``settings.lgbm_threads``.
+        """
+        import lightgbm as lgb
+        horizon = horizon or settings.horizon
+        frame = frame.sort_values(SERIES_KEYS + ["date"])
+        y = frame[y_col].to_numpy(dtype=float, na_value=np.nan)
+        sid = frame.groupby(SERIES_KEYS, sort=False, observed=True).ngroup().to_numpy()
+        params = self._booster_params()
+        X = self._features(frame).reset_index(drop=True)
+        lagged = [c for c in X.columns if c.startswith(("lag_","rollmean_","rollstd_"))]
+        base = lgb.Dataset(X, label=y, params={"verbose": -1}, free_raw_data=False).construct()
+        subsets = []
+        for h in range(1, horizon + 1):
+            # target h - 1 rows ahead within the same series
+            target = np.full(len(y), np.nan)
+            target[:len(y) - h + 1] = y[h - 1:]
+            target[:len(y) - h + 1][sid[h - 1:] != sid[:len(y) - h + 1]] = np.nan
+            rows = np.flatnonzero(~np.isnan(target))
+            # lags as of the origin row, every other feature from the target row
+            X_h = X.iloc[rows].reset_index(drop=True)
+            ahead = X.drop(columns=lagged).iloc[rows + h - 1].reset_index(drop=True)
+            X_h[ahead.columns] = ahead
+            subsets.append(lgb.Dataset(X_h, label=target[rows], reference=base, params={"verbose": -1}).construct())
+        budget = getattr(settings, "lgbm_threads", 0) or os.cpu_count() or 1
+        workers = max(min(horizon, budget), 1)
+        params["num_threads"] = max(budget // workers, 1)
+        rounds = self.model.get_params()["n_estimators"]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            self.boosters = list(pool.map(lambda ds: lgb.train(params, ds, num_boost_round=rounds), subsets))
+        return self
+
+    def predict_direct(self, history: pd.DataFrame, future: pd.DataFrame, y_col: str = "units") -> pd.DataFrame:
+        """Forecast every step of `future` from the boosters of `fit_direct`.
+
+        Booster h reads future row h of each series with its lag_* and
+        roll* columns filled from `history` as of the first future period
+        (like step 1 of `predict_recursive`). Same inputs and output as
+        `predict_recursive`.
+        """
+        _, order = self._future_series(future)
+        if order.shape[1] > len(self.boosters):
+            raise ValueError(f"Model was fit for {len(self.boosters)} steps; future has {order.shape[1]}.")
+        buf = self._ring_buffer(history, future, order, self._lag_windows()[2], y_col)
+        preds = np.empty(order.shape)
+        for step in range(order.shape[1] if len(order) else 0):
+            X_step = self._fill_lag_roll(future.iloc[order[:, step]], buf, 0)
+            preds[:, step] = self.boosters[step].predict(self._features(X_step))
+        return self._forecast_frame(future, order, preds)
+
+
+def predict_recursive_grouped(models: Dict[object, LightGBMForecaster], history: pd.DataFrame, future: pd.DataFrame,
+                              key: str = "sku_id", y_col: str = "units") -> pd.DataFrame:
+    """`predict_recursive` for series forecast by different fitted models, one per value of `future[key]`.
+
+    The models must share their feature columns. The ring buffer and the
+    lag/rolling fill run once per step for every series; each model then
+    predicts the rows of its own series, so per-SKU models keep their own
+    boosters while the recursion is batched. Same output as `predict_recursive`.
+    """
+    first = next(iter(models.values()))
+    _, order = first._future_series(future)
+    size = first._lag_windows()[2]
+    buf = first._ring_buffer(history, future, order, size, y_col)
+    owner = future[key].to_numpy()[order[:, 0]]
+    groups = [(models[k], np.flatnonzero(owner == k)) for k in models]
+    preds = np.empty(order.shape)
+    head = 0
+    for step in range(order.shape[1]):
+        X_step = first._fill_lag_roll(future.iloc[order[:, step]], buf, head)
+        for model, rows in groups:
+            if len(rows):
+                preds[rows, step] = model.model.predict(model._features(X_step.iloc[rows]))
+        buf[:, head] = preds[:, step]
+        head = (head + 1) % size
+    return LightGBMForecaster._forecast_frame(future, order, preds)
+
+class GlobalLightGBMForecaster(LightGBMForecaster):
+    """One LightGBM model over the stacked panel of every series.
+
+    `id_cols` enter as categorical features, with categories fixed at fit
+    time (ids unseen then become missing). Fit once on the output of
+    ``prepare_features`` and forecast all series together with
+    `predict_recursive` or `fit_direct`/`predict_direct`.
+    """
+    def __init__(self, feature_cols: List[str], id_cols: List[str] = SERIES_KEYS):
+        self.id_cols = list(id_cols)
+        super().__init__([c for c in feature_cols if c not in self.id_cols] + self.id_cols)
+        self.id_dtypes = {}
+
+    def _features(self, X: pd.DataFrame) -> pd.DataFrame:
+        # categories are the ids as strings, so numeric ids are cast before the lookup; unseen ids get code -1 (missing)
+        X_local = super()._features(X)
+        return X_local.assign(**{
+            c: pd.Categorical.from_codes(dtype.categories.get_indexer(X_local[c].astype(str)), dtype=dtype)
+            for c, dtype in self.id_dtypes.items()
+        })
+
+    def _fix_ids(self, X: pd.DataFrame) -> None:
+        self.id_dtypes = {c: pd.CategoricalDtype(sorted(X[c].astype(str).unique())) for c in self.id_cols}
+
+    def fit(self, y: pd.Series, X: Optional[pd.DataFrame] = None):
+        self._fix_ids(X)
+        return super().fit(y, X)
+
+    def fit_direct(self, frame: pd.DataFrame, horizon: Optional[int] = None, y_col: str = "units"):
+        self._fix_ids(frame)
+        return super().fit_direct(frame, horizon, y_col)
@@ -3,15 +3,52 @@ class Settings:
         self.frequency = "W"
         self.horizon = 12
         self.country = "IN"
+        # Cache the daily calendar/holiday table as Parquet under data/cache/calendar
+        self.calendar_cache = True
         self.use_lgbm = True
+        # LightGBM multi-step forecasts: "recursive" (one model fed its own predictions) or "direct" (one booster per step)
+        self.lgbm_strategy = "recursive"
+        # Threads shared by the per-horizon boosters of LightGBMForecaster.fit_direct (0 = all cores)
+        self.lgbm_threads = 0
         # Data source configuration
         self.use_sample = False  # set to False to read your CSV
         self.csv_path = "data/raw/"
+        # Local SQLite/DuckDB file to read instead of csv_path (filters and weekly aggregation run in SQL)
+        self.sql_path = None
+        self.sql_table = "sales"
+        # Cache normalized per-file frames as Parquet under data/cache/ingest
+        self.ingest_cache = True
+        # Parallel file parsing: workers > 1 enables a "thread" or "process" pool
+        self.ingest_workers = 1
+        self.ingest_executor = "thread"
+        # Rows per CSV chunk; when set, ingest streams chunks into running weekly aggregates
+        self.ingest_chunksize = None
+        # Append new drops into a persisted weekly store (data/cache/weekly_store) using per-series watermarks
+        self.ingest_incremental = False
+        # When daily/weekly/monthly files cover the same series, keep only the finest grain per period
+        self.dedup_granularity = True
+        # validate_sales writes a per-series data-quality report to data/outputs/data_quality.csv
+        self.quality_report = True
+        # Dense memory-mapped [series, weeks] panel (see src/data/panel.py)
+        self.panel_path = "data/cache/panel"
+        # "polars": Arrow multi-threaded CSV reads, Polars weekly aggregation and lag/rolling features (frames stay pandas)
+        self.backend = "pandas"
         # Performance/quick mode
         self.quick_mode = True
         self.max_groups = 3
         self.quick_horizon = 4
         self.light_features = True
+        # Carry sku_id/region_id/channel_id as categoricals; decoded only when writing outputs
+        self.categorical_ids = True
+        # "series": one model per SKU; "cluster": one shared model per cluster of similar series
+        self.model_scope = "series"
+        self.n_clusters = 20
+        # Cache series clusters as Parquet under data/cache/clusters, keyed by a digest of the weekly units
+        self.cluster_cache = True
+        # Persist prepare_features output (data/cache/feature_store) and recompute only the tail of appended series
+        self.feature_store = False
+        # "double" keeps float64/int64 features; "lean" builds float32 features and int8/int16 calendar/flag columns
+        self.precision = "double"
         # Map your CSV columns to internal schema
         # Update values on the right to match your file headers
         self.column_map = {
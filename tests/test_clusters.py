@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from src.data.panel import build_panel
+from src.models.cluster import forecast_ets_clusters
+
+
+def _series(sku, region, weeks, scale):
+    t = np.arange(len(weeks))
+    return pd.DataFrame({"sku_id": sku, "region_id": region, "date": weeks,
+                         "units": scale * (10 + 3 * np.sin(2 * np.pi * t / 13))})
+
+
+def test_ets_cluster_forecast_is_aligned_to_each_series_last_week():
+    weeks = pd.date_range("2020-01-05", periods=80, freq="W-SUN")
+    df = pd.concat([_series("A", "North", weeks, 1.0), _series("A", "South", weeks[:-3], 2.0)], ignore_index=True)
+    clusters = pd.DataFrame({"sku_id": ["A", "A"], "region_id": ["North", "South"], "cluster": [0, 0]})
+    out = forecast_ets_clusters(build_panel(df, fields=["units"]), clusters, horizon=6)
+    # both regions are forecast, each from the week after its own last week
+    assert set(out["region_id"]) == {"North", "South"}
+    north, south = (out[out["region_id"] == r].set_index("date") for r in ["North", "South"])
+    assert north.index[0] == weeks[-1] + pd.Timedelta(weeks=1)
+    assert south.index[0] == weeks[-3]
+    # same curve, so each series' forecast over its own mean agrees on shared dates
+    north_mean, south_mean = df.groupby("region_id")["units"].mean()[["North", "South"]]
+    shared = north.index.intersection(south.index)
+    assert len(shared) == 3
+    np.testing.assert_allclose(north.loc[shared, "forecast"] / north_mean,
+                               south.loc[shared, "forecast"] / south_mean, rtol=1e-9)
@@ -0,0 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pandas as pd
+from src.data import ingest
+
+
+def test_thread_workers_keep_every_digest(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "INGEST_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(ingest, "DIGEST_INDEX", tmp_path / "cache" / "digests.json")
+    files = []
+    for i in range(24):
+        files.append(tmp_path / f"part{i}.csv")
+        pd.DataFrame({"date": ["2024-01-01"], "sku_id": f"S{i}", "region_id": "R", "units": [i]}).to_csv(files[-1], index=False)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        digests = list(pool.map(ingest._file_digest_cached, files))
+    index = json.loads(ingest.DIGEST_INDEX.read_text())
+    assert [index[str(fp.resolve())][2] for fp in files] == digests == [ingest._file_digest(fp) for fp in files]
+    assert list((tmp_path / "cache").glob("*.tmp")) == []
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.synthetic import generate_synthetic
+from src.features.build_features import compute_features
+from src.features.future import build_future_exog
+from src.features.spec import feature_columns
+from src.models.lgbm import GlobalLightGBMForecaster
+
+
+def _int_id_features():
+    df = generate_synthetic(n_skus=6, n_regions=2, n_weeks=80, seed=1)
+    df["sku_id"] = df["sku_id"].str[4:].astype(int)
+    df["region_id"] = df["region_id"].str[1:].astype(int)
+    return compute_features(df, models=["LightGBM"])
+
+
+def test_integer_ids_become_categories():
+    feats = _int_id_features()
+    model = GlobalLightGBMForecaster(feature_cols=feature_columns("LightGBM", feats))
+    model.model.set_params(n_estimators=20)
+    model.fit(feats["units"], feats)
+    X = model._features(feats)
+    assert X[["sku_id","region_id"]].notna().all().all()
+    assert X["sku_id"].nunique() == 6
+    importance = dict(zip(model.feature_cols, model.model.feature_importances_))
+    assert importance["sku_id"] + importance["region_id"] > 0
+    out = model.predict_recursive(feats, build_future_exog(feats, 4))
+    assert len(out) == 12 * 4 and np.isfinite(out["forecast"]).all()
+    # unseen ids are missing, not a new category
+    assert model._features(feats.assign(sku_id=999))["sku_id"].isna().all()
+
+
+def test_direct_strategy_with_integer_ids():
+    feats = _int_id_features()
+    model = GlobalLightGBMForecaster(feature_cols=feature_columns("LightGBM", feats))
+    model.model.set_params(n_estimators=20)
+    model.fit_direct(feats, horizon=4)
+    assert len(model.boosters) == 4
+    # every booster sees the ids as categorical features with the categories fixed at fit time
+    assert all(b.pandas_categorical == [list(map(str, range(6))), ["0", "1"]] for b in model.boosters)
+    future = build_future_exog(feats, 4)
+    out = model.predict_direct(feats, future)
+    pd.testing.assert_frame_equal(out[["sku_id","region_id","date"]], future[["sku_id","region_id","date"]])
+    assert np.isfinite(out["forecast"]).all()
+    # one booster per step: the forecast does not depend on the row order of `future`
+    shuffled = future.sample(frac=1, random_state=0)
+    pd.testing.assert_frame_equal(model.predict_direct(feats, shuffled).sort_index(), out)
+    with pytest.raises(ValueError):
+        model.predict_direct(feats, build_future_exog(feats, 5))
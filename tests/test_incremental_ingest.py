@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+from src.data import ingest
+from src.data.ingest import load_sales
+from src.utils.config import settings
+
+
+@pytest.fixture
+def raw_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name, value in [("csv_path", str(tmp_path / "raw")), ("use_sample", False), ("dedup_granularity", False),
+                        ("ingest_cache", False), ("ingest_chunksize", None), ("ingest_incremental", True),
+                        ("quality_report", False), ("sql_path", None)]:
+        monkeypatch.setattr(settings, name, value)
+    (tmp_path / "raw").mkdir()
+    return tmp_path / "raw"
+
+
+def _write(path, sku, days):
+    pd.DataFrame({"date": days, "sku_id": sku, "region_id": "R", "units": range(1, len(days) + 1)}).to_csv(path, index=False)
+
+
+def _full_load(monkeypatch):
+    monkeypatch.setattr(settings, "ingest_incremental", False)
+    out = load_sales(sample=False)
+    monkeypatch.setattr(settings, "ingest_incremental", True)
+    return out
+
+
+def test_daily_drops_cut_mid_week_match_full_load(raw_dir, monkeypatch):
+    monkeypatch.setattr(ingest, "WEEKLY_STORE_MAX_SEGMENTS", 2)
+    days = pd.date_range("2024-01-01", "2024-03-31", freq="D")
+    # weekly drops cut on Wednesdays, so every refresh re-aggregates a boundary week
+    for i, cut in enumerate(range(17, len(days) + 14, 14)):
+        _write(raw_dir / f"drop{i}.csv", "A", days[cut - 14:cut])
+        pd.testing.assert_frame_equal(load_sales(sample=False), _full_load(monkeypatch))
+    assert len(list(ingest.WEEKLY_STORE_DIR.glob("segment-*.parquet"))) <= 2
+
+
+def test_new_source_path_rebuilds_the_store(raw_dir, tmp_path, monkeypatch):
+    other = tmp_path / "other"
+    other.mkdir()
+    _write(other / "a.csv", "ZZZ", pd.date_range("2024-01-01", periods=30, freq="D"))
+    monkeypatch.setattr(settings, "csv_path", str(other))
+    assert "ZZZ" in set(load_sales(sample=False)["sku_id"].astype(str))
+    _write(raw_dir / "b.csv", "B", pd.date_range("2024-01-01", periods=30, freq="D"))
+    monkeypatch.setattr(settings, "csv_path", str(raw_dir))
+    assert set(load_sales(sample=False)["sku_id"].astype(str)) == {"B"}
+
+
+def test_deleted_file_drops_its_series(raw_dir):
+    _write(raw_dir / "a.csv", "A", pd.date_range("2024-01-01", periods=30, freq="D"))
+    _write(raw_dir / "b.csv", "B", pd.date_range("2024-01-01", periods=30, freq="D"))
+    load_sales(sample=False)
+    (raw_dir / "a.csv").unlink()
+    assert set(load_sales(sample=False)["sku_id"].astype(str)) == {"B"}
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from src.data.ingest import load_sales
+from src.utils.config import settings
+
+
+@pytest.fixture
+def raw_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name, value in [("csv_path", str(tmp_path / "raw")), ("use_sample", False), ("dedup_granularity", True),
+                        ("ingest_cache", False), ("ingest_chunksize", None), ("ingest_incremental", False),
+                        ("quality_report", False), ("sql_path", None)]:
+        monkeypatch.setattr(settings, name, value)
+    (tmp_path / "raw").mkdir()
+    return tmp_path / "raw"
+
+
+def _write(path, dates, units):
+    pd.DataFrame({"date": dates, "sku_id": "A", "region_id": "R", "units": units}).to_csv(path, index=False)
+
+
+def test_partial_boundary_weeks_keep_the_weekly_total(raw_dir):
+    # daily rows from Thursday 2024-01-04 to Tuesday 2024-01-23: weeks ending 01-07 and 01-28 are partial
+    days = pd.date_range("2024-01-04", "2024-01-23", freq="D")
+    _write(raw_dir / "daily.csv", days, 1.0)
+    weeks = pd.date_range("2024-01-07", "2024-01-28", freq="W-SUN")
+    _write(raw_dir / "weekly.csv", weeks, [100.0, 200.0, 300.0, 400.0])
+    out = load_sales(sample=False).set_index("date")["units"]
+    assert out.loc["2024-01-07"] == 100.0   # partial daily week: weekly total kept, daily rows dropped
+    assert out.loc["2024-01-14"] == 7.0     # fully covered by daily rows
+    assert out.loc["2024-01-21"] == 7.0
+    assert out.loc["2024-01-28"] == 400.0
+
+
+def test_internal_gap_is_not_covered(raw_dir):
+    days = pd.date_range("2024-01-01", "2024-01-21", freq="D")
+    days = days[days != "2024-01-10"]
+    _write(raw_dir / "daily.csv", days, 1.0)
+    _write(raw_dir / "weekly.csv", pd.date_range("2024-01-07", "2024-01-21", freq="W-SUN"), 50.0)
+    out = load_sales(sample=False).set_index("date")["units"]
+    assert out.loc["2024-01-07"] == 7.0
+    assert out.loc["2024-01-14"] == 50.0    # one day missing inside the week
+    assert out.loc["2024-01-21"] == 7.0
+
+
+def test_weeks_across_month_edges_keep_every_day(raw_dir):
+    # weeks 2024-10-28 .. 2025-01-05 cover Nov and Dec exactly, plus Oct 28-31 and Jan 1-5
+    _write(raw_dir / "weekly.csv", pd.date_range("2024-11-03", "2025-01-05", freq="W-SUN"), 70.0)
+    _write(raw_dir / "monthly.csv", pd.date_range("2024-10-01", "2025-01-01", freq="MS"), 3100.0)
+    out = load_sales(sample=False).set_index("date")["units"]
+    assert out.loc["2024-12-29"] == 70.0    # Nov and Dec monthly rows dropped
+    assert out.loc["2024-10-06"] == pytest.approx(3100.0 * 27 / 31)   # Oct keeps the days before 10-28
+    assert out.loc["2025-01-05"] == pytest.approx(70.0 + 3100.0 * 26 / 31)   # Dec 30-31 stay in the week
+    assert out.sum() == pytest.approx(10 * 70.0 + 3100.0 * (27 + 26) / 31)
+
+
+def test_days_after_the_last_weekly_sunday_keep_the_monthly_remainder(raw_dir):
+    # weekly rows end Sunday 2024-12-29; Dec 30-31 only exist in the monthly total (labelled on the last day)
+    _write(raw_dir / "weekly.csv", pd.date_range("2024-11-03", "2024-12-29", freq="W-SUN"), 70.0)
+    _write(raw_dir / "monthly.csv", pd.date_range("2024-11-30", "2024-12-31", freq="ME"), 3100.0)
+    out = load_sales(sample=False).set_index("date")["units"]
+    assert (out.loc["2024-11-03":"2024-12-29"] == 70.0).all()
+    assert out.loc["2025-01-05"] == pytest.approx(3100.0 * 2 / 31)
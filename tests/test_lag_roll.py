@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.synthetic import generate_synthetic
+from src.features.build_features import _grouped_lag_roll, compute_features
+from src.utils.config import settings
+
+
+@pytest.fixture(autouse=True)
+def full_features(monkeypatch):
+    monkeypatch.setattr(settings, "light_features", False)
+
+
+def _pandas_lag_roll(y, sid, lags, windows):
+    s = pd.Series(y).groupby(sid)
+    out = {f"lag_{lag}": s.shift(lag).to_numpy() for lag in lags}
+    prev = s.shift(1).groupby(sid)
+    for win in windows:
+        out[f"rollmean_{win}"] = prev.rolling(win).mean().to_numpy()
+        out[f"rollstd_{win}"] = prev.rolling(win).std().to_numpy()
+    return out
+
+
+@pytest.mark.parametrize("lengths", [[5], [1], [3, 2, 7], [30, 1, 13]])
+def test_short_panels_match_pandas(lengths):
+    rng = np.random.default_rng(0)
+    y = rng.poisson(20, sum(lengths)).astype(float)
+    sid = np.repeat(np.arange(len(lengths)), lengths)
+    start = np.r_[True, sid[1:] != sid[:-1]]
+    got = _grouped_lag_roll(y, start, [1, 2, 4, 8, 12], [4, 8, 12, 26])
+    for name, expected in _pandas_lag_roll(y, sid, [1, 2, 4, 8, 12], [4, 8, 12, 26]).items():
+        np.testing.assert_allclose(got[name], expected, rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+def test_single_short_series_keeps_warm_rows():
+    df = generate_synthetic(n_skus=1, n_regions=1, n_weeks=5, seed=0)
+    feats = compute_features(df)
+    assert len(feats) == 1
+    assert feats["lag_1"].iloc[0] == df["units"].iloc[3]
+
+
+def test_small_windows_after_large_values_keep_precision():
+    y = np.r_[np.full(20, 1e6), np.arange(40) % 6].astype(float)
+    sid = np.zeros(len(y), dtype=int)
+    got = _grouped_lag_roll(y, np.r_[True, np.zeros(len(y) - 1, dtype=bool)], [], [4])
+    expected = _pandas_lag_roll(y, sid, [], [4])["rollstd_4"]
+    np.testing.assert_allclose(got["rollstd_4"][30:], expected[30:], rtol=1e-9)
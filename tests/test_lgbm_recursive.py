@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from src.data.synthetic import generate_synthetic
+from src.features.build_features import compute_features
+from src.features.future import build_future_exog
+from src.features.spec import feature_columns
+from src.models.lgbm import LightGBMForecaster, predict_recursive_grouped
+
+
+def test_grouped_recursion_matches_each_model_and_ignores_row_order():
+    feats = compute_features(generate_synthetic(n_skus=3, n_regions=2, n_weeks=80, seed=2), models=["LightGBM"])
+    cols = feature_columns("LightGBM", feats)
+    future = build_future_exog(feats, 6).sample(frac=1, random_state=0)
+    models = {}
+    for sku, g in feats.groupby("sku_id", observed=True):
+        models[sku] = LightGBMForecaster(cols)
+        models[sku].model.set_params(n_estimators=20, verbose=-1)
+        models[sku].fit(g["units"], g)
+    out = predict_recursive_grouped(models, feats, future)
+    for sku, model in models.items():
+        rows = future["sku_id"] == sku
+        expected = model.predict_recursive(feats[feats["sku_id"] == sku], future[rows])
+        pd.testing.assert_frame_equal(out[rows.to_numpy()], expected)
+    assert np.isfinite(out["forecast"]).all()
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data import ingest
+from src.data.ingest import load_sales
+from src.utils.config import settings
+
+
+@pytest.fixture
+def raw_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name, value in [("csv_path", str(tmp_path / "raw")), ("use_sample", False), ("dedup_granularity", False),
+                        ("ingest_cache", False), ("ingest_chunksize", None), ("ingest_incremental", False),
+                        ("quality_report", False), ("sql_path", None)]:
+        monkeypatch.setattr(settings, name, value)
+    (tmp_path / "raw").mkdir()
+    return tmp_path / "raw"
+
+
+def test_batched_folds_match_the_in_memory_load(raw_dir, monkeypatch):
+    rng = np.random.default_rng(0)
+    for i in range(2):
+        n = 400
+        pd.DataFrame({
+            "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 120, n), unit="D"),
+            "sku_id": rng.choice(["A","B","C"], n), "region_id": "R",
+            "units": rng.integers(0, 9, n).astype(float), "price": rng.uniform(1, 2, n),
+        }).to_csv(raw_dir / f"part{i}.csv", index=False)
+    expected = load_sales(sample=False)
+    monkeypatch.setattr(ingest, "STREAM_FOLD_CHUNKS", 3)
+    monkeypatch.setattr(settings, "ingest_chunksize", 25)   # 32 chunks, folded in batches of 3
+    pd.testing.assert_frame_equal(load_sales(sample=False), expected, check_exact=False, rtol=1e-12)